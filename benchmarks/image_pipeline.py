@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Image Pipeline Benchmark
+Measures what a UFO drop costs: decode, transform and encode time and peak
+memory for every registered effect at several resolutions, plus end-to-end
+apply_image_effect / get_random_image_with_effect timings.
+
+Usage:
+    python benchmarks/image_pipeline.py                   # run and print
+    python benchmarks/image_pipeline.py --save-baseline   # also store results as the baseline
+    python benchmarks/image_pipeline.py --compare         # fail if slower than the baseline
+
+Timings only compare on the machine they were recorded on, so the baseline
+is not shipped: record one with --save-baseline on the machine that runs
+--compare (e.g. the build machine) before changing the pipeline, and commit
+benchmarks/baseline.json from there.
+
+Fixture images are generated locally and the network is stubbed, so results
+only depend on the machine. Each stage case runs in a forked child process:
+"peak MB" is how far that child's resident memory grew (Pillow's buffers
+included), "traced MB" is the tracemalloc peak (Python and NumPy only).
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+import psutil
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from utils import animation, effects, helpers
+from utils.cdn_cache import cdn_cache
+from utils.effect_registry import DEFAULT_EFFECTS, effect_registry
+from utils.variants import VariantCache
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+RESOLUTIONS = [(640, 480), (1920, 1080), (4000, 3000)]
+
+# Timed repeats per case (the fastest run is kept)
+REPEATS = 3
+
+# --compare fails when a time is this much slower than the baseline
+REGRESSION_THRESHOLD = 1.25
+
+# Times below this are too noisy to compare (in milliseconds)
+MIN_COMPARABLE_MS = 5
+
+
+def make_fixture(size, seed=0):
+    """A deterministic photo-like JPEG: gradient, noise and a colour cast."""
+    random.seed(seed)
+    img = Image.linear_gradient('L').resize(size).convert('RGB')
+    noise = Image.effect_noise(size, 48).convert('RGB')
+    tint = Image.new('RGB', size, (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)))
+    img = Image.blend(Image.blend(img, noise, 0.4), tint, 0.3)
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def run_stages(image_data, effect):
+    """Decode, transform and encode once, timing each stage."""
+    definition = DEFAULT_EFFECTS[effect]
+    settings = definition.get("animation")
+    timings = {}
+
+    start = time.perf_counter()
+    max_edge = effects.MAX_EDGE if settings is None else animation.ANIMATION_MAX_EDGE
+    img = effects.load_rgb(io.BytesIO(image_data), max_edge)
+    timings["decode"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    img = effects.apply_effect(img, definition["stages"])
+    if settings is not None:
+        frames = animation.glitch_frames(animation.np.asarray(img), settings)
+    timings["transform"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if settings is None:
+        data = effects.encode_image(img).data
+    else:
+        data = animation._encode_frames(frames)
+    timings["encode"] = time.perf_counter() - start
+    timings["bytes"] = len(data)
+    return timings
+
+
+def measure_case(image_data, effect, results):
+    """Child process body: best-of-REPEATS times plus peak memory."""
+    rss_before = psutil.Process().memory_info().rss
+    best = None
+    for _ in range(REPEATS):
+        timings = run_stages(image_data, effect)
+        if best is None or sum(timings[k] for k in ("decode", "transform", "encode")) < \
+                sum(best[k] for k in ("decode", "transform", "encode")):
+            best = timings
+    # Tracing slows everything down, so it gets its own untimed run
+    tracemalloc.start()
+    run_stages(image_data, effect)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    max_rss = max_rss if sys.platform == "darwin" else max_rss * 1024
+    best["peak_mb"] = max(0, max_rss - rss_before) / 1024 / 1024
+    best["traced_mb"] = traced_peak / 1024 / 1024
+    results.put(best)
+
+
+def run_case(context, image_data, effect):
+    results = context.Queue()
+    process = context.Process(target=measure_case, args=(image_data, effect, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+async def run_end_to_end(image_data):
+    """Time the public entry points with the image download stubbed out."""
+
+    async def fake_download(url):
+        return image_data
+
+    import utils.variants as variants
+    variants.image_cache.get = fake_download
+    cdn_cache.set_asset_channel(None)
+    effect_registry.reload_if_changed()
+    url = helpers.IMAGE_URLS[0]
+    timings = {}
+
+    for effect in DEFAULT_EFFECTS:
+        # Cold: nothing cached, the render happens now (in a thread, no pool)
+        variants.variant_cache = helpers.variant_cache = VariantCache()
+        start = time.perf_counter()
+        await helpers.apply_image_effect(url, effect)
+        timings[f"apply_image_effect[{effect}] cold"] = time.perf_counter() - start
+        # Warm: served from the variant cache
+        start = time.perf_counter()
+        await helpers.apply_image_effect(url, effect)
+        timings[f"apply_image_effect[{effect}] warm"] = time.perf_counter() - start
+
+    # A random drop once the variant cache has been warmed
+    helpers.variant_cache.configure(helpers.IMAGE_URLS)
+    await helpers.variant_cache._warm_task
+    start = time.perf_counter()
+    for _ in range(100):
+        await helpers.get_random_image_with_effect()
+    timings["get_random_image_with_effect warm (per call)"] = (time.perf_counter() - start) / 100
+    return timings
+
+
+def compare(results, baseline):
+    """Print cases slower than the baseline. Returns True if any regressed."""
+    regressed = False
+    for key, value in results.items():
+        old = baseline.get(key)
+        if old is None or not key.endswith("_ms"):
+            continue
+        if max(value, old) < MIN_COMPARABLE_MS:
+            continue
+        if value > old * REGRESSION_THRESHOLD:
+            regressed = True
+            print(f"❌ {key}: {value:.1f}ms (baseline {old:.1f}ms, {value / old:.2f}x)")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="exit non-zero on regressions against the baseline")
+    args = parser.parse_args()
+
+    # Fail before the (slow) run rather than after it
+    if args.compare and not os.path.exists(BASELINE_FILE):
+        sys.exit(f"❌ No baseline at {BASELINE_FILE} to compare against. Record one on this machine "
+                 f"first with --save-baseline (before your change), then run --compare again.")
+
+    context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    results = {}
+
+    print(f"{'resolution':>11} {'effect':>12} {'decode ms':>10} {'transform ms':>13} {'encode ms':>10} "
+          f"{'KB':>6} {'peak MB':>8} {'traced MB':>10}")
+    for size in RESOLUTIONS:
+        image_data = make_fixture(size)
+        for effect in DEFAULT_EFFECTS:
+            case = run_case(context, image_data, effect)
+            name = f"{size[0]}x{size[1]} {effect}"
+            for stage in ("decode", "transform", "encode"):
+                results[f"{name} {stage}_ms"] = case[stage] * 1000
+            results[f"{name} peak_mb"] = case["peak_mb"]
+            print(f"{size[0]:>5}x{size[1]:<5} {effect:>12} {case['decode'] * 1000:>10.1f} "
+                  f"{case['transform'] * 1000:>13.1f} {case['encode'] * 1000:>10.1f} "
+                  f"{case['bytes'] // 1024:>6} {case['peak_mb']:>8.1f} {case['traced_mb']:>10.1f}")
+
+    print()
+    end_to_end = asyncio.run(run_end_to_end(make_fixture(RESOLUTIONS[1])))
+    for name, seconds in end_to_end.items():
+        results[f"{name}_ms"] = seconds * 1000
+        print(f"{name:>52}: {seconds * 1000:.2f}ms")
+
+    if args.compare:
+        with open(BASELINE_FILE, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("machine") != platform.node():
+            print(f"⚠️ Baseline was recorded on {baseline.get('machine')}, not this machine")
+        if compare(results, baseline["results"]):
+            sys.exit(1)
+        print("✅ No regressions against the baseline")
+
+    if args.save_baseline:
+        with open(BASELINE_FILE, "w") as f:
+            json.dump({
+                "machine": platform.node(),
+                "python": platform.python_version(),
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results
+            }, f, indent=4)
+        print(f"💾 Saved baseline to {BASELINE_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+UFO Image Library Builder
+Scans assets/ufos/ and writes its manifest.json (dimensions, hash, weight).
+
+Usage:
+    python build_image_library.py [directory]
+
+Run it again after adding or removing images. Weights edited by hand in the
+manifest are kept. The running bot reloads the manifest on its next drop.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from utils.library import LIBRARY_DIR, build_manifest, save_manifest
+from utils.log import setup_logging, start_logging, stop_logging
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else LIBRARY_DIR
+    if not os.path.isdir(directory):
+        sys.exit(f"❌ {directory} does not exist - create it and add some UFO images first.")
+
+    # Shows the images that were skipped
+    setup_logging()
+    start_logging()
+    manifest = build_manifest(directory)
+    stop_logging()
+    save_manifest(manifest, os.path.join(directory, "manifest.json"))
+    total_bytes = sum(entry["bytes"] for entry in manifest["images"])
+    print(f"📚 Wrote manifest for {len(manifest['images'])} images ({total_bytes / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
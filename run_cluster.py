@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+UFO Sighting Bot Cluster Launcher
+Runs the bot as several worker processes, each owning a range of shards.
+
+Usage:
+    python run_cluster.py [clusters] [shards]
+
+Both values can also come from CLUSTER_COUNT and SHARD_COUNT. Processes share
+counters, bans, tickets and the posting schedule through STATE_BACKEND_URL,
+which is required when running more than one cluster.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+
+# Wait before restarting a worker that exited with an error (in seconds)
+RESTART_DELAY = 10
+
+
+def split_shards(shard_count, cluster_count):
+    """Split shard IDs into contiguous ranges, one per cluster."""
+    base, extra = divmod(shard_count, cluster_count)
+    ranges = []
+    start = 0
+    for cluster_id in range(cluster_count):
+        size = base + (1 if cluster_id < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def run_worker(cluster_id, shard_ids, shard_count):
+    """Run one bot process for the given shards."""
+    os.environ['CLUSTER_ID'] = str(cluster_id)
+    os.environ['SHARD_IDS'] = ",".join(str(shard_id) for shard_id in shard_ids)
+    os.environ['SHARD_COUNT'] = str(shard_count)
+    sys.path.insert(0, SRC_DIR)
+
+    from ufo_main import bot, token
+    print(f"🛰️ Cluster {cluster_id} starting with shards {shard_ids}")
+    bot.run(token)
+
+
+def start_worker(context, cluster_id, shard_ids, shard_count):
+    process = context.Process(
+        target=run_worker, args=(cluster_id, shard_ids, shard_count),
+        name=f"ufo-cluster-{cluster_id}"
+    )
+    process.start()
+    return process
+
+
+def main():
+    load_dotenv()
+    cluster_count = int(sys.argv[1] if len(sys.argv) > 1 else os.getenv('CLUSTER_COUNT', os.cpu_count() or 1))
+    shard_count = int(sys.argv[2] if len(sys.argv) > 2 else os.getenv('SHARD_COUNT', cluster_count))
+
+    if cluster_count < 1 or shard_count < cluster_count:
+        sys.exit("❌ Need at least one cluster and at least one shard per cluster.")
+    if cluster_count > 1 and not os.getenv('STATE_BACKEND_URL'):
+        sys.exit("❌ STATE_BACKEND_URL must be set so clusters can share state.")
+
+    # Fork each worker from a clean launcher (the bot is only imported in the worker)
+    context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    shard_ranges = split_shards(shard_count, cluster_count)
+    workers = {
+        cluster_id: start_worker(context, cluster_id, shard_ids, shard_count)
+        for cluster_id, shard_ids in enumerate(shard_ranges)
+    }
+    print(f"🚀 Started {cluster_count} clusters for {shard_count} shards")
+
+    # cluster_id -> time a crashed worker is due to restart (other workers keep being watched)
+    restarts = {}
+
+    try:
+        while True:
+            time.sleep(1)
+            now = time.monotonic()
+            for cluster_id, process in list(workers.items()):
+                if cluster_id in restarts:
+                    if now >= restarts[cluster_id]:
+                        del restarts[cluster_id]
+                        workers[cluster_id] = start_worker(context, cluster_id, shard_ranges[cluster_id], shard_count)
+                    continue
+                if process.is_alive():
+                    continue
+                if process.exitcode == 0:
+                    print(f"🛑 Cluster {cluster_id} stopped")
+                    del workers[cluster_id]
+                    continue
+                print(f"⚠️ Cluster {cluster_id} exited with code {process.exitcode} - restarting in {RESTART_DELAY}s")
+                restarts[cluster_id] = now + RESTART_DELAY
+            if not workers:
+                break
+    except KeyboardInterrupt:
+        print("🛑 Stopping clusters...")
+        for process in workers.values():
+            process.terminate()
+        for process in workers.values():
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
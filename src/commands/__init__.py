@@ -7,6 +7,9 @@ from .setup import setup_setup_commands
 from .help import setup_help_commands
 from .support import setup_support_commands
 from .alien import setup_alien_commands
+from utils.log import get_logger
+
+log = get_logger(__name__)
 
 def setup_all_commands(bot, bot_start_time):
     """Set up all command modules."""
@@ -21,8 +24,8 @@ async def load_ban_commands(bot):
     """Load ban commands as a cog."""
     try:
         await bot.load_extension('commands.ban')
-        print("✅ Ban commands loaded successfully")
+        log.info("✅ Ban commands loaded")
     except Exception as e:
-        print(f"❌ Failed to load ban commands: {e}")
+        log.error("❌ Failed to load ban commands", error=e)
 
 __all__ = ['setup_all_commands', 'load_ban_commands']
\ No newline at end of file
@@ -1,15 +1,32 @@
 """
 Admin and bot information commands for the UFO Sighting Bot.
 """
+import asyncio
 import discord
 from discord.ext import commands
+import io
 import psutil
 import platform
+import math
 from datetime import datetime
 from utils import (
     load_reactions, format_uptime, is_admin_user,
-    add_admin_user, remove_admin_user, get_admin_users, load_config, create_welcome_embed
+    add_admin_user, remove_admin_user, get_admin_users, load_config, create_welcome_embed,
+    get_global_log_channel_id
 )
+from utils.dispatch import (
+    outbound, channel_route, PRIORITY_BACKGROUND, PRIORITY_NAMES, rest_latency, rest_requests, rest_rate_limited
+)
+from utils.metrics import loop_lag, storage_flush, reaction_latency, sightings_recorded
+from utils.variants import render_time
+from utils.profiling import profiler, ProfilerBusy, MAX_PROFILE_SECONDS, DEFAULT_PROFILE_SECONDS, DEFAULT_TOP
+from utils.shards import shard_stats
+from utils.http_client import http_client
+from utils.cdn_cache import cdn_cache
+from utils.state import run_state_call
+from utils.log import get_logger
+
+log = get_logger(__name__)
 
 def setup_admin_commands(bot, bot_start_time):
     """Set up admin-related commands."""
@@ -44,7 +61,7 @@ def setup_admin_commands(bot, bot_start_time):
         user_count = len(bot.users)
         
         # Calculate total reactions across all servers
-        reactions_data = load_reactions()
+        reactions_data = await run_state_call(load_reactions)
         total_reactions = 0
         total_users_with_reactions = 0
         for guild_data in reactions_data.values():
@@ -60,6 +77,9 @@ def setup_admin_commands(bot, bot_start_time):
         config = load_config()
         configured_channels = len(config)
         
+        # Get live posting schedule count
+        active_schedules = bot.post_scheduler.active_count
+        
         # Create embed
         embed = discord.Embed(
             title="🛸 UFO Sighting Bot Information",
@@ -73,6 +93,7 @@ def setup_admin_commands(bot, bot_start_time):
             value=f"**Servers:** {guild_count}\n"
                   f"**Users:** {user_count}\n"
                   f"**Configured Channels:** {configured_channels}\n"
+                  f"**Active UFO Schedules:** {active_schedules}\n"
                   f"**Total Reactions Tracked:** {total_reactions:,}\n"
                   f"**Active Alien Spotters:** {total_users_with_reactions}",
             inline=True
@@ -98,6 +119,62 @@ def setup_admin_commands(bot, bot_start_time):
             inline=True
         )
         
+        # Outbound send queue
+        sent = sum(rest_requests.value(name, "sent") for name in PRIORITY_NAMES.values())
+        failed = sum(rest_requests.value(name, "failed") for name in PRIORITY_NAMES.values())
+        embed.add_field(
+            name="📮 Send Queue",
+            value=f"**Queued:** {outbound.queued['interaction']} interaction / {outbound.queued['post']} post / {outbound.queued['background']} background\n"
+                  f"**Sent:** {sent:,} (**Failed:** {failed:,})\n"
+                  f"**Rate Limited (429):** {rest_rate_limited.value():,}",
+            inline=False
+        )
+        
+        # Latencies from the metrics registry (p50 / p95 since startup)
+        def percentiles(histogram):
+            return f"{histogram.quantile(0.5) * 1000:.0f} / {histogram.quantile(0.95) * 1000:.0f}ms"
+        
+        embed.add_field(
+            name="📈 Performance (p50 / p95)",
+            value=f"**Reaction Handling:** {percentiles(reaction_latency)} ({sightings_recorded.value():,} sightings)\n"
+                  f"**Image Renders:** {percentiles(render_time)} ({render_time.count():,} renders)\n"
+                  f"**REST Sends:** {percentiles(rest_latency)}\n"
+                  f"**Storage Writes:** {percentiles(storage_flush)}\n"
+                  f"**Event Loop Lag:** {percentiles(loop_lag)}",
+            inline=False
+        )
+        
+        # Image download timings from the shared HTTP pool
+        fetch_requests = sum(timing.requests for timing in http_client.timings.values())
+        fetch_failures = sum(timing.failures for timing in http_client.timings.values())
+        fetch_seconds = sum(timing.total_seconds for timing in http_client.timings.values())
+        fetch_average_ms = fetch_seconds / fetch_requests * 1000 if fetch_requests else 0
+        embed.add_field(
+            name="🌐 Image Fetches",
+            value=f"**Requests:** {fetch_requests:,} (**Failed:** {fetch_failures:,})\n"
+                  f"**Average Time:** {fetch_average_ms:.0f}ms\n"
+                  f"**Variant Uploads:** {cdn_cache.uploads:,} (**Reused:** {cdn_cache.reused:,})",
+            inline=False
+        )
+        
+        # Per-shard latency, event rate and schedules
+        schedules_by_shard = bot.post_scheduler.schedules_by_shard()
+        shard_lines = []
+        for shard_id, latency in sorted(bot.latencies)[:10]:
+            # Latency is NaN until the shard's first heartbeat
+            latency_text = "connecting" if math.isnan(latency) else f"{round(latency * 1000)}ms"
+            shard_lines.append(
+                f"**#{shard_id}:** {latency_text} • {shard_stats.events_per_minute(shard_id)} events/min • "
+                f"{schedules_by_shard.get(shard_id, 0)} schedules"
+            )
+        if len(bot.latencies) > 10:
+            shard_lines.append(f"... and {len(bot.latencies) - 10} more shards")
+        embed.add_field(
+            name=f"🧩 Shards ({bot.shard_count or 1})",
+            value="\n".join(shard_lines) if shard_lines else "No shards connected",
+            inline=False
+        )
+        
         # Guild list (if not too many)
         if guild_count <= 10:
             guild_list = "\n".join([f"• {guild.name} ({guild.member_count} members)" for guild in bot.guilds])
@@ -117,6 +194,60 @@ def setup_admin_commands(bot, bot_start_time):
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+    @bot.tree.command(name="profile", description="Profile the bot for a few seconds (admin)")
+    @discord.app_commands.describe(
+        seconds=f"How long to profile (1-{MAX_PROFILE_SECONDS} seconds)",
+        top="Number of functions to list",
+        sort="Order functions by total time, time in the function itself, or calls",
+        memory="Also track memory allocations (slower)"
+    )
+    @discord.app_commands.choices(sort=[
+        discord.app_commands.Choice(name="cumulative time", value="cumulative"),
+        discord.app_commands.Choice(name="own time", value="own"),
+        discord.app_commands.Choice(name="calls", value="calls"),
+    ])
+    async def profile(
+        interaction: discord.Interaction,
+        seconds: discord.app_commands.Range[int, 1, MAX_PROFILE_SECONDS] = DEFAULT_PROFILE_SECONDS,
+        top: discord.app_commands.Range[int, 5, 30] = DEFAULT_TOP,
+        sort: str = "cumulative",
+        memory: bool = True
+    ):
+        # Check if user is admin
+        if not is_admin_user(interaction.user.id):
+            await interaction.response.send_message("❌ Only admins can profile the bot.", ephemeral=True)
+            return
+
+        if profiler.running:
+            await interaction.response.send_message("⏳ A profiling session is already running - try again shortly.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            result = await profiler.run(seconds, top=top, sort=sort, memory=memory)
+        except ProfilerBusy:
+            await interaction.followup.send("⏳ A profiling session is already running - try again shortly.", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="🔬 Profile",
+            description=f"```\n{result.functions[:3900]}\n```",
+            color=0x0099ff,
+            timestamp=datetime.now()
+        )
+        if result.memory is not None:
+            embed.add_field(
+                name="🧠 Memory Still Allocated",
+                value=f"```\n{result.memory[:1000]}\n```",
+                inline=False
+            )
+        embed.set_footer(
+            text=f"{result.seconds:.1f}s on the event loop • {result.calls:,} calls • "
+                 f"open the .pstats file with pstats or snakeviz"
+        )
+        stats_file = discord.File(io.BytesIO(result.stats), filename=f"ufo_profile_{datetime.now():%Y%m%d_%H%M%S}.pstats")
+        await interaction.followup.send(embed=embed, file=stats_file, ephemeral=True)
+
     @bot.tree.command(name="sync", description="Sync slash commands (owner)")
     async def sync_commands(interaction: discord.Interaction):
         # Check if user is admin
@@ -279,6 +410,119 @@ def setup_admin_commands(bot, bot_start_time):
             )
             await interaction.followup.send(embed=error_embed, ephemeral=True)
 
+    @bot.tree.command(name="setassetchannel", description="Set channel that stores uploaded UFO images (admin)")
+    async def setassetchannel(interaction: discord.Interaction, channel: discord.TextChannel = None):
+        # Check if user is admin
+        if not is_admin_user(interaction.user.id):
+            await interaction.response.send_message(
+                "❌ You need admin permissions to set the asset channel.",
+                ephemeral=True
+            )
+            return
+
+        if interaction.guild is None:
+            await interaction.response.send_message(
+                "❌ This command must be used in a server.",
+                ephemeral=True
+            )
+            return
+
+        # If no channel specified, use current channel
+        if channel is None:
+            channel = interaction.channel
+
+        from utils import set_asset_channel_id
+        set_asset_channel_id(channel.id)
+        cdn_cache.set_asset_channel(channel)
+
+        embed = discord.Embed(
+            title="🗂️ Asset Channel Set",
+            description=f"Processed UFO images will be uploaded once to {channel.mention} and reused from there.",
+            color=0x00ff41,
+            timestamp=datetime.now()
+        )
+        embed.add_field(
+            name="ℹ️ Note:",
+            value="Don't delete messages in this channel - UFO posts link to them. "
+                  "The bot needs **Send Messages**, **Attach Files** and **Read Message History** permissions there.",
+            inline=False
+        )
+        embed.set_footer(
+            text=f"Set by {interaction.user.display_name}",
+            icon_url=interaction.user.display_avatar.url
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # Delivery reports still waiting on their broadcast
+    broadcast_reports = set()
+
+    async def report_global_message(message, pending_sends, failed_sends, failed_guilds, guild_count):
+        """Wait for a global message's queued sends and post a delivery summary."""
+        successful_sends = 0
+        for guild, future in pending_sends:
+            try:
+                await future
+                successful_sends += 1
+            except discord.Forbidden:
+                failed_sends += 1
+                failed_guilds.append(f"{guild.name} (No permission)")
+            except discord.HTTPException as e:
+                failed_sends += 1
+                failed_guilds.append(f"{guild.name} (HTTP error)")
+        log.info("📢 Global message delivered", sent=successful_sends, failed=failed_sends)
+        
+        # Create summary embed
+        summary_embed = discord.Embed(
+            title="📊 Global Message Summary",
+            color=0x00ff41 if failed_sends == 0 else 0xff6600,
+            timestamp=datetime.now()
+        )
+    
+        summary_embed.add_field(
+            name="✅ Successful Sends",
+            value=f"**{successful_sends}** servers",
+            inline=True
+        )
+    
+        summary_embed.add_field(
+            name="❌ Failed Sends",
+            value=f"**{failed_sends}** servers",
+            inline=True
+        )
+    
+        summary_embed.add_field(
+            name="📈 Success Rate",
+            value=f"**{(successful_sends / guild_count * 100):.1f}%**",
+            inline=True
+        )
+    
+        summary_embed.add_field(
+            name="💬 Message Sent",
+            value=message[:100] + ("..." if len(message) > 100 else ""),
+            inline=False
+        )
+    
+        if failed_guilds:
+            failed_list = "\n".join(failed_guilds[:10])  # Show first 10 failures
+            if len(failed_guilds) > 10:
+                failed_list += f"\n... and {len(failed_guilds) - 10} more"
+        
+            summary_embed.add_field(
+                name="🔍 Failed Servers",
+                value=failed_list,
+                inline=False
+            )
+        
+        summary_embed.set_footer(text="Global message delivery complete")
+        
+        global_log_channel_id = get_global_log_channel_id()
+        global_log_channel = bot.get_channel(global_log_channel_id) if global_log_channel_id else None
+        if global_log_channel:
+            outbound.send_later(
+                PRIORITY_BACKGROUND, channel_route(global_log_channel),
+                lambda: global_log_channel.send(embed=summary_embed), "global message summary"
+            )
+
     @bot.tree.command(name="globalmessage", description="Send global message (admin)")
     async def global_message(interaction: discord.Interaction, message: str):
         # Check if user is admin
@@ -306,9 +550,9 @@ def setup_admin_commands(bot, bot_start_time):
         
         # Get all guilds and their configured channels
         config = load_config()
-        successful_sends = 0
         failed_sends = 0
         failed_guilds = []
+        pending_sends = []
         
         for guild in bot.guilds:
             guild_id = str(guild.id)
@@ -342,15 +586,12 @@ def setup_admin_commands(bot, bot_start_time):
             if channel_id:
                 channel = bot.get_channel(channel_id)
                 if channel:
-                    try:
-                        await channel.send(embed=global_embed)
-                        successful_sends += 1
-                    except discord.Forbidden:
-                        failed_sends += 1
-                        failed_guilds.append(f"{guild.name} (No permission)")
-                    except discord.HTTPException as e:
-                        failed_sends += 1
-                        failed_guilds.append(f"{guild.name} (HTTP error)")
+                    # Broadcasts queue behind user-facing and UFO sends
+                    future = outbound.submit(
+                        PRIORITY_BACKGROUND, channel_route(channel),
+                        lambda channel=channel: channel.send(embed=global_embed)
+                    )
+                    pending_sends.append((guild, future))
                 else:
                     failed_sends += 1
                     failed_guilds.append(f"{guild.name} (Channel not found)")
@@ -358,51 +599,24 @@ def setup_admin_commands(bot, bot_start_time):
                 failed_sends += 1
                 failed_guilds.append(f"{guild.name} (No suitable channel)")
         
-        # Create summary embed
-        summary_embed = discord.Embed(
-            title="📊 Global Message Summary",
-            color=0x00ff41 if failed_sends == 0 else 0xff6600,
-            timestamp=datetime.now()
-        )
-        
-        summary_embed.add_field(
-            name="✅ Successful Sends",
-            value=f"**{successful_sends}** servers",
-            inline=True
-        )
-        
-        summary_embed.add_field(
-            name="❌ Failed Sends",
-            value=f"**{failed_sends}** servers",
-            inline=True
-        )
-        
-        summary_embed.add_field(
-            name="📈 Success Rate",
-            value=f"**{(successful_sends / len(bot.guilds) * 100):.1f}%**",
-            inline=True
+        # Reply right away: at one paced background send after another, a large
+        # broadcast outlasts the interaction token, so the delivery summary is
+        # posted to the global log channel once every send has finished
+        if get_global_log_channel_id():
+            report_note = "The delivery summary will be posted to the global log channel."
+        else:
+            report_note = "Set a global log channel to get a delivery summary."
+        await interaction.followup.send(
+            f"📢 Queued the global message for **{len(pending_sends)}** servers "
+            f"({failed_sends} skipped). {report_note}",
+            ephemeral=True
         )
-        
-        summary_embed.add_field(
-            name="💬 Message Sent",
-            value=message[:100] + ("..." if len(message) > 100 else ""),
-            inline=False
+        task = asyncio.create_task(
+            report_global_message(message, pending_sends, failed_sends, failed_guilds, len(bot.guilds))
         )
-        
-        if failed_guilds:
-            failed_list = "\n".join(failed_guilds[:10])  # Show first 10 failures
-            if len(failed_guilds) > 10:
-                failed_list += f"\n... and {len(failed_guilds) - 10} more"
-            
-            summary_embed.add_field(
-                name="🔍 Failed Servers",
-                value=failed_list,
-                inline=False
-            )
-        
-        summary_embed.set_footer(text="Global message delivery complete")
-        
-        await interaction.followup.send(embed=summary_embed, ephemeral=True)
+        # The event loop only keeps weak references to tasks
+        broadcast_reports.add(task)
+        task.add_done_callback(broadcast_reports.discard)
 
     @bot.tree.command(name="testsetup", description="Test welcome setup message (admin)")
     async def test_setup(interaction: discord.Interaction):
@@ -8,6 +8,11 @@ import google.generativeai as genai
 import asyncio
 from datetime import datetime
 from utils.helpers import is_user_banned
+from utils.state import run_state_call
+from utils.ratelimit import enforce_rate_limit
+from utils.log import get_logger
+
+log = get_logger(__name__)
 
 # Configure Gemini AI
 def configure_gemini():
@@ -67,14 +72,14 @@ Respond as PAUL the alien. Keep your response SHORT (2-3 sentences maximum). Be
             )
             
             if response.text:
-                print(f"✅ Alien response generated using model: {model_name}")
+                log.debug("✅ Alien response generated", model=model_name)
                 return response.text.strip()
             else:
                 continue  # Try next model
                 
         except Exception as e:
             error_msg = str(e).lower()
-            print(f"⚠️ Model {model_name} failed: {e}")
+            log.warning("⚠️ Alien chat model failed", model=model_name, error=e)
             
             # Check for specific free tier errors
             if "quota exceeded" in error_msg or "rate limit" in error_msg:
@@ -97,8 +102,12 @@ def setup_alien_commands(bot):
         message="Your message to the alien"
     )
     async def alien_chat(interaction: discord.Interaction, message: str):
+        # Reject floods before doing any file I/O
+        if not await enforce_rate_limit(interaction, "alien"):
+            return
+
         # Check if user is banned
-        if is_user_banned(interaction.user.id):
+        if await run_state_call(is_user_banned, interaction.user.id):
             embed = discord.Embed(
                 title="🚫 Access Denied",
                 description="You are banned from using this bot.",
@@ -164,7 +173,7 @@ def setup_alien_commands(bot):
             
             await interaction.followup.send(embed=embed, file=file)
             
-            print(f"👽 Alien chat: {interaction.user.display_name} -> '{message[:50]}...'")
+            log.info("👽 Alien chat", user=interaction.user.id, message=message[:50])
             
         except Exception as e:
             await interaction.followup.send(
@@ -174,4 +183,4 @@ def setup_alien_commands(bot):
                 f"Please try again in a moment.",
                 ephemeral=True
             )
-            print(f"❌ Alien chat error: {e}")
+            log.error("❌ Alien chat error", error=e)
@@ -7,6 +7,7 @@ from discord import app_commands
 from src.utils.helpers import (
     is_user_banned, ban_user, unban_user, get_ban_info
 )
+from src.utils.state import run_state_call
 from datetime import datetime
 
 class BanCommands(commands.Cog):
@@ -45,7 +46,7 @@ class BanCommands(commands.Cog):
             pass  # User might not be in the server
 
         # Check if user is already banned
-        if is_user_banned(user.id):
+        if await run_state_call(is_user_banned, user.id):
             embed = discord.Embed(
                 title="⚠️ Already Banned",
                 description=f"{user.mention} is already banned from using the bot.",
@@ -55,7 +56,7 @@ class BanCommands(commands.Cog):
             return
 
         # Ban the user
-        ban_user(user.id, reason, interaction.user.id)
+        await run_state_call(ban_user, user.id, reason, interaction.user.id)
 
         embed = discord.Embed(
             title="🔨 User Banned",
@@ -84,7 +85,7 @@ class BanCommands(commands.Cog):
             return
 
         # Check if user is banned
-        if not is_user_banned(user.id):
+        if not await run_state_call(is_user_banned, user.id):
             embed = discord.Embed(
                 title="⚠️ Not Banned",
                 description=f"{user.mention} is not currently banned.",
@@ -94,10 +95,10 @@ class BanCommands(commands.Cog):
             return
 
         # Get ban info before unbanning
-        ban_info = get_ban_info(user.id)
+        ban_info = await run_state_call(get_ban_info, user.id)
         
         # Unban the user
-        if unban_user(user.id):
+        if await run_state_call(unban_user, user.id):
             embed = discord.Embed(
                 title="✅ User Unbanned",
                 description=f"{user.mention} has been unbanned and can now use the UFO Sighting Bot.",
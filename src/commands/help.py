@@ -37,7 +37,9 @@ def setup_help_commands(bot):
         # Setup commands (if in a server)
         if interaction.guild:
             setup_commands = [
-                "`/setchannel` - Set this channel for UFO image messages"
+                "`/setchannel` - Set this channel for UFO image messages",
+                "`/uniquespotters <enabled>` - Count each user once per UFO image",
+                "`/effectodds [effect] [weight]` - View or change UFO image effect odds"
             ]
 
             embed.add_field(
@@ -116,10 +118,12 @@ def setup_help_commands(bot):
         # Admin commands
         admin_commands = [
             "`/botinfo` - Display bot system information and stats",
+            "`/profile [seconds]` - Profile the bot and get the slowest functions",
             "`/authorize <user>` - Add user to the admin list",
             "`/deauthorize <user>` - Remove user from the admin list",
             "`/listauthorized` - List all admin users",
             "`/setlogchannel [channel]` - Set global logging channel (logs all servers)",
+            "`/setassetchannel [channel]` - Set channel that stores uploaded UFO images",
             "`/supportchannel [channel]` - Set channel for support requests",
             "`/reply <ticket_id> <response>` - Reply to a support ticket",
             "`/ban <user> [reason]` - Ban a user from using the bot",
@@ -3,9 +3,15 @@ Channel setup and testing commands for the UFO Sighting Bot.
 """
 import discord
 from discord.ext import commands
-import asyncio
-from utils import load_config, save_config, get_random_image
+from utils import load_config, save_config, get_random_image, get_guild_setting, set_guild_setting
+from utils.effect_registry import effect_registry
 from utils.auth import is_admin_user
+from utils.ratelimit import enforce_rate_limit
+from utils.state import run_state_call
+from utils.dispatch import outbound, channel_route, PRIORITY_POST
+from utils.log import get_logger
+
+log = get_logger(__name__)
 
 def setup_setup_commands(bot):
     """Set up channel configuration and testing commands."""
@@ -31,6 +37,63 @@ def setup_setup_commands(bot):
             ephemeral=True
         )
 
+    @bot.tree.command(name="uniquespotters", description="Count each user once per UFO image")
+    @discord.app_commands.describe(
+        enabled="Credit each user at most one sighting per UFO image"
+    )
+    @discord.app_commands.checks.has_permissions(manage_guild=True)
+    async def uniquespotters(interaction: discord.Interaction, enabled: bool):
+        if interaction.guild is None:
+            await interaction.response.send_message("❌ This command must be used in a server.", ephemeral=True)
+            return
+
+        set_guild_setting(interaction.guild.id, "unique_spotters", enabled)
+
+        if enabled:
+            message = "✅ Unique spotter mode enabled. Each user now counts once per UFO image, no matter how many emojis they add."
+        else:
+            message = "✅ Unique spotter mode disabled. Every emoji reaction counts as a sighting again."
+        await interaction.response.send_message(message, ephemeral=True)
+
+    @bot.tree.command(name="effectodds", description="Change how often a UFO image effect appears")
+    @discord.app_commands.describe(
+        effect="Effect name (leave empty to see the current odds)",
+        weight="Relative weight (0 turns the effect off)"
+    )
+    @discord.app_commands.checks.has_permissions(manage_guild=True)
+    async def effectodds(interaction: discord.Interaction, effect: str = None, weight: float = None):
+        if interaction.guild is None:
+            await interaction.response.send_message("❌ This command must be used in a server.", ephemeral=True)
+            return
+
+        effect_registry.reload_if_changed()
+        if effect is not None:
+            if effect not in effect_registry.effects:
+                names = ", ".join(f"`{name}`" for name in effect_registry.names)
+                await interaction.response.send_message(f"❌ Unknown effect. Available effects: {names}", ephemeral=True)
+                return
+            if weight is None or weight < 0:
+                await interaction.response.send_message("❌ Give a weight of 0 or more.", ephemeral=True)
+                return
+            guild_weights = dict(get_guild_setting(interaction.guild.id, "effect_weights") or {})
+            guild_weights[effect] = weight
+            if not any(w > 0 for w in {**effect_registry.weights(), **guild_weights}.values()):
+                await interaction.response.send_message("❌ At least one effect needs a weight above 0.", ephemeral=True)
+                return
+            set_guild_setting(interaction.guild.id, "effect_weights", guild_weights)
+
+        weights = effect_registry.weights(interaction.guild.id)
+        total = sum(weights.values()) or 1
+        lines = [f"`{name}` - weight {w:g} ({w / total:.0%})" for name, w in weights.items()]
+        await interaction.response.send_message("🎨 **UFO image effect odds**\n" + "\n".join(lines), ephemeral=True)
+
+    @effectodds.autocomplete("effect")
+    async def effectodds_autocomplete(interaction: discord.Interaction, current: str):
+        return [
+            discord.app_commands.Choice(name=name, value=name)
+            for name in effect_registry.names if current.lower() in name.lower()
+        ][:25]
+
     @bot.tree.command(name="testimage", description="Send test UFO image (admin)")
     async def testimage(interaction: discord.Interaction):
         # Check if user is admin
@@ -45,30 +108,33 @@ def setup_setup_commands(bot):
 
         # Get image with random effect applied
         from utils.helpers import get_random_image_with_effect
-        image_content = await get_random_image_with_effect()
+        image_content = await get_random_image_with_effect(interaction.guild.id if interaction.guild else None)
         try:
             # Send either URL string or Discord File
             if isinstance(image_content, str):
-                message = await interaction.channel.send(image_content)
+                message = await outbound.send(
+                    PRIORITY_POST, channel_route(interaction.channel),
+                    lambda: interaction.channel.send(image_content)
+                )
                 image_url = image_content
             else:  # Discord File object
-                message = await interaction.channel.send(file=image_content)
+                message = await outbound.send(
+                    PRIORITY_POST, channel_route(interaction.channel),
+                    lambda: interaction.channel.send(file=image_content)
+                )
                 image_url = f"[Test UFO Image with effects]"
             
             # Track this test message too so reactions count
-            from ufo_main import bot_ufo_messages, log_image_sent
-            bot_ufo_messages[message.id] = str(interaction.guild.id) if interaction.guild else "dm"
-            print(f"🧪 Test image sent (Message ID: {message.id}) - now tracking for reactions")
+            bot.ufo_messages.track(message.id, str(interaction.guild.id) if interaction.guild else "dm")
+            bot.ufo_messages.schedule_delete(message)
+            log.info("🧪 Test image sent - now tracking for reactions", message=message.id)
             
             # Log test image sending to global channel
-            await log_image_sent(interaction.channel, message, image_url)
+            await bot.log_image_sent(interaction.channel, message, image_url)
             
-            await message.add_reaction("👽")
-            print(f"🤖 Bot added 👽 reaction to test message {message.id}")
-            await asyncio.sleep(4)
-            await message.delete()
-            print(f"🗑️ Test message {message.id} deleted after 4 seconds")
-            await interaction.followup.send("✅ Test image sent, reacted, and deleted.", ephemeral=True)
+            await outbound.send(PRIORITY_POST, channel_route(message.channel), lambda: message.add_reaction("👽"))
+            log.debug("🤖 Bot added 👽 reaction to test message", message=message.id)
+            await interaction.followup.send("✅ Test image sent and reacted. It will be deleted shortly.", ephemeral=True)
         except discord.HTTPException as e:
             await interaction.followup.send(f"❌ Failed: {e}", ephemeral=True)
 
@@ -77,6 +143,10 @@ def setup_setup_commands(bot):
         user="The user to check sightings for (leave empty for your own sightings)"
     )
     async def usersightings(interaction: discord.Interaction, user: discord.User = None):
+        # Reject floods before doing any file I/O
+        if not await enforce_rate_limit(interaction, "usersightings"):
+            return
+
         from utils import load_reactions
         
         # Default to the user who ran the command
@@ -84,7 +154,7 @@ def setup_setup_commands(bot):
         target_user_id = str(target_user.id)
         
         # Load reactions data
-        reactions_data = load_reactions()
+        reactions_data = await run_state_call(load_reactions)
         
         # Create embed
         embed = discord.Embed(
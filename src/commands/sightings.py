@@ -6,14 +6,20 @@ from discord.ext import commands
 from datetime import datetime
 from utils import load_reactions
 from utils.helpers import is_user_banned
+from utils.state import run_state_call
+from utils.ratelimit import enforce_rate_limit
 
 def setup_sightings_commands(bot):
     """Set up sighting-related commands."""
     
     @bot.tree.command(name="localsightings", description="View your UFO sightings in server")
     async def localsightings(interaction: discord.Interaction):
+        # Reject floods before doing any file I/O
+        if not await enforce_rate_limit(interaction, "localsightings"):
+            return
+
         # Check if user is banned
-        if is_user_banned(interaction.user.id):
+        if await run_state_call(is_user_banned, interaction.user.id):
             embed = discord.Embed(
                 title="🚫 Access Denied",
                 description="You are banned from using this bot.",
@@ -29,7 +35,7 @@ def setup_sightings_commands(bot):
         guild_id = str(interaction.guild.id)
         user_id = str(interaction.user.id)
 
-        reactions_data = load_reactions()
+        reactions_data = await run_state_call(load_reactions)
         guild_data = reactions_data.get(guild_id, {})
         user_count = guild_data.get(user_id, 0)
 
@@ -142,8 +148,12 @@ def setup_sightings_commands(bot):
 
     @bot.tree.command(name="globalsightings", description="View your UFO sightings globally")
     async def globalsightings(interaction: discord.Interaction):
+        # Reject floods before doing any file I/O
+        if not await enforce_rate_limit(interaction, "globalsightings"):
+            return
+
         # Check if user is banned
-        if is_user_banned(interaction.user.id):
+        if await run_state_call(is_user_banned, interaction.user.id):
             embed = discord.Embed(
                 title="🚫 Access Denied",
                 description="You are banned from using this bot.",
@@ -154,7 +164,7 @@ def setup_sightings_commands(bot):
             
         user_id = str(interaction.user.id)
 
-        reactions_data = load_reactions()
+        reactions_data = await run_state_call(load_reactions)
         
         # Add up user's counts across all guilds
         total_count = 0
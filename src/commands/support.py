@@ -10,14 +10,21 @@ from utils import (
     create_ticket, get_ticket, delete_ticket, get_open_tickets
 )
 from utils.helpers import is_user_banned
+from utils.state import run_state_call
+from utils.dispatch import outbound, channel_route, dm_route, PRIORITY_INTERACTION
+from utils.ratelimit import enforce_rate_limit
 
 def setup_support_commands(bot):
     """Set up support-related commands."""
     
     @bot.tree.command(name="support", description="Get help from administrators")
     async def support_request(interaction: discord.Interaction, message: str):
+        # Reject floods before doing any file I/O
+        if not await enforce_rate_limit(interaction, "support"):
+            return
+
         # Check if user is banned
-        if is_user_banned(interaction.user.id):
+        if await run_state_call(is_user_banned, interaction.user.id):
             embed = discord.Embed(
                 title="🚫 Access Denied",
                 description="You are banned from using this bot.",
@@ -52,7 +59,8 @@ def setup_support_commands(bot):
             return
         
         # Create the support ticket using the new system
-        ticket_id = create_ticket(
+        ticket_id = await run_state_call(
+            create_ticket,
             user_id=interaction.user.id,
             user_name=interaction.user.display_name,
             guild_id=interaction.guild.id if interaction.guild else None,
@@ -101,7 +109,10 @@ def setup_support_commands(bot):
         
         # Send to support channel first
         try:
-            await support_channel.send(embed=support_embed)
+            await outbound.send(
+                PRIORITY_INTERACTION, channel_route(support_channel),
+                lambda: support_channel.send(embed=support_embed)
+            )
             success = True
             error_message = None
         except discord.Forbidden:
@@ -249,7 +260,7 @@ def setup_support_commands(bot):
             return
         
         # Get the ticket using new system
-        ticket = get_ticket(ticket_id)
+        ticket = await run_state_call(get_ticket, ticket_id)
         
         if not ticket:
             await interaction.response.send_message(
@@ -319,10 +330,10 @@ def setup_support_commands(bot):
         user_embed.set_footer(text=f"Responded by {interaction.user.display_name}")
         
         try:
-            await user.send(embed=user_embed)
+            await outbound.send(PRIORITY_INTERACTION, dm_route(user), lambda: user.send(embed=user_embed))
             
             # Delete ticket after admin response (ticket is resolved)
-            delete_ticket(ticket_id)
+            await run_state_call(delete_ticket, ticket_id)
             
             # Confirm to admin
             admin_embed = discord.Embed(
@@ -366,7 +377,11 @@ def setup_support_commands(bot):
             )
     @bot.tree.command(name="closeticket", description="Close your support ticket")
     async def close_ticket_cmd(interaction: discord.Interaction, ticket_id: str):
-        ticket = get_ticket(ticket_id)
+        # Reject floods before doing any file I/O
+        if not await enforce_rate_limit(interaction, "closeticket"):
+            return
+
+        ticket = await run_state_call(get_ticket, ticket_id)
 
         if not ticket:
             await interaction.response.send_message(
@@ -382,7 +397,7 @@ def setup_support_commands(bot):
             return
         
         # Delete the ticket directly (no need to close first)
-        success = delete_ticket(ticket_id)
+        success = await run_state_call(delete_ticket, ticket_id)
         
         if success:
             await interaction.response.send_message(
@@ -404,8 +419,8 @@ def setup_support_commands(bot):
             return
         
         from utils.tickets import load_tickets
-        all_tickets = load_tickets()
-        open_tickets = get_open_tickets()
+        all_tickets = await run_state_call(load_tickets)
+        open_tickets = await run_state_call(get_open_tickets)
         
         embed = discord.Embed(
             title="📊 Support Ticket Statistics",
@@ -457,7 +472,7 @@ def setup_support_commands(bot):
             )
             return
         
-        open_tickets = get_open_tickets()
+        open_tickets = await run_state_call(get_open_tickets)
         
         if not open_tickets:
             await interaction.response.send_message(
@@ -4,27 +4,79 @@ A Discord bot that sends random UFO images and tracks user reactions.
 """
 import discord
 from discord.ext import commands
-import asyncio
 import os
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Import our custom modules
-from utils import load_config, load_reactions, save_reactions, get_random_image, get_random_interval, get_global_log_channel_id, create_welcome_embed
+from utils import load_config, increment_reaction, get_global_log_channel_id, create_welcome_embed, get_guild_setting, get_guild_channel_id, add_config_listener, get_asset_channel_id
 from utils.helpers import get_random_image_with_effect, is_user_banned
+from utils.tracking import MessageTracker
+from utils.ratelimit import rate_limiter
+from utils.state import run_state_call
+from utils.scheduler import PostingScheduler
+from utils.shards import get_shard_count, get_shard_ids, get_cluster_id, shard_for_guild, shard_stats
+from utils.http_client import http_client
+from utils.helpers import get_image_sources
+from utils.variants import variant_cache
+from utils.render_pool import render_pool
+from utils.cdn_cache import cdn_cache
+from utils.dispatch import outbound, channel_route, PRIORITY_POST, PRIORITY_BACKGROUND
+from utils.log import get_logger, setup_logging, start_logging, stop_logging
+from utils.metrics import metrics, reaction_latency, sightings_recorded
 from commands import setup_all_commands
 
 # Load environment variables
 load_dotenv()
 token = os.getenv('DISCORD_TOKEN')
 
+# Log levels and sampling come from LOG_LEVEL, LOG_LEVELS and LOG_SAMPLE
+setup_logging()
+log = get_logger(__name__)
+
 # Bot setup
 intents = discord.Intents.default()
 intents.message_content = True
 intents.reactions = True
 intents.members = True
 
-bot = commands.Bot(command_prefix="ufo ", intents=intents)
+class UFOBot(commands.AutoShardedBot):
+    """Bot subclass that starts background services before connecting."""
+
+    async def setup_hook(self):
+        # Fork image render workers first, before any other threads exist
+        render_pool.start()
+        # Queued log lines are written from here on
+        start_logging()
+        # Local Prometheus endpoint and event loop lag sampling
+        await metrics.start()
+        # Outbound send queue used by everything below
+        outbound.start()
+        # Shared connection pool for image downloads
+        await http_client.start()
+        # Render every image/effect variant in the background
+        variant_cache.configure(get_image_sources())
+        # With a fixed shard count we know which guilds are ours before connecting
+        if self.shard_count:
+            post_scheduler.set_shards(self.shard_count, self.shard_ids)
+        # Single reaper for delayed deletes and tracking expiry
+        bot_ufo_messages.start()
+        # Single scheduler for UFO drops across all guilds, resumed from disk
+        post_scheduler.start()
+
+    async def close(self):
+        # Persist planned drops so the next start resumes them
+        post_scheduler.stop()
+        outbound.stop()
+        await http_client.close()
+        await metrics.stop()
+        render_pool.stop()
+        await super().close()
+        stop_logging()
+
+# Shard count comes from SHARD_COUNT (Discord recommends one if unset)
+# The cluster launcher also sets SHARD_IDS so each process runs its own range
+bot = UFOBot(command_prefix="ufo ", intents=intents, shard_count=get_shard_count(), shard_ids=get_shard_ids())
 
 # Bot start time for uptime tracking
 bot_start_time = datetime.now()
@@ -34,7 +86,7 @@ recent_reactions = {}  # Format: {(user_id, message_id, emoji): timestamp}
 
 # Track bot's UFO messages (message_id -> guild_id) for reaction tracking
 # We keep messages in memory for 60 seconds after deletion to handle late reactions
-bot_ufo_messages = {}
+bot_ufo_messages = MessageTracker()
 
 async def log_image_sent(channel, message, image_url):
     """Log when the bot sends a UFO image to the global logging channel."""
@@ -82,83 +134,75 @@ async def log_image_sent(channel, message, image_url):
         log_embed.set_footer(text="UFO Image Deployment System")
         log_embed.set_thumbnail(url=image_url)  # Show the image as thumbnail
         
-        await global_log_channel.send(embed=log_embed)
-        print(f"   📡 Image send logged to global channel")
+        # Logs queue behind user-facing and UFO sends
+        outbound.send_later(
+            PRIORITY_BACKGROUND, channel_route(global_log_channel),
+            lambda: global_log_channel.send(embed=log_embed), "image send log"
+        )
+        log.debug("📡 Image send queued for global channel log", message=message.id)
         
     except Exception as e:
-        print(f"Failed to log image send to global channel: {e}")
+        log.warning("Failed to log image send to global channel", error=e)
+
+# --- Scheduled UFO drop for a single guild ---
+async def post_to_guild(guild_id: str, image_content=None):
+    """Send one UFO image to a guild. Called by the posting scheduler when the guild is due.
 
-# --- Independent image loop per guild ---
-async def send_images_to_guild(guild_id: str):
-    """Send UFO images to a specific guild at random intervals."""
+    image_content is the post prepared ahead of time by the scheduler, if any.
+    Returns the sent message ID, or None if nothing was posted.
+    """
     await bot.wait_until_ready()
-    while not bot.is_closed():
-        config = load_config()
-        if guild_id not in config:
-            await asyncio.sleep(30)  # check again later
-            continue
-
-        # Handle both old format (integer) and new format (dictionary)
-        guild_config = config[guild_id]
-        if isinstance(guild_config, dict):
-            channel_id = guild_config.get("channel_id")
-        else:
-            # Old format - guild_config is just the channel ID integer
-            channel_id = guild_config
-            
-        if channel_id is None:
-            await asyncio.sleep(30)
-            continue
-
-        channel = bot.get_channel(channel_id)
-        if channel is None:
-            await asyncio.sleep(30)
-            continue
-
-        # Wait for random interval before sending first image
-        interval = get_random_interval()
-        await asyncio.sleep(interval)
-
-        # Get image with random effect applied
-        image_content = await get_random_image_with_effect()
-        try:
-            # Send either URL string or Discord File
-            if isinstance(image_content, str):
-                message = await channel.send(image_content)
-                image_url = image_content
-            else:  # Discord File object
-                message = await channel.send(file=image_content)
-                image_url = f"[Processed UFO Image with effects]"
-            
-            # Track this message ID so we know it's from the bot even after deletion
-            bot_ufo_messages[message.id] = guild_id
-            print(f"📤 Sent UFO image in guild {guild_id}, message ID: {message.id} - now tracking for reactions")
-            
-            # Log image sending to global channel
-            await log_image_sent(channel, message, image_url)
-            
-            await message.add_reaction("👽")
-            print(f"🤖 Bot added 👽 reaction to UFO message {message.id}")
-            await asyncio.sleep(4)  # how long the image stays
-            await message.delete()
-            print(f"🗑️ UFO message {message.id} deleted after 4 seconds")
-            
-            # Keep message ID in memory for 60 more seconds to catch late reactions
-            await asyncio.sleep(60)
-            if message.id in bot_ufo_messages:
-                del bot_ufo_messages[message.id]
-                print(f"🧹 Cleaned up message ID {message.id} from tracking after 60s")
-        except discord.HTTPException as e:
-            print(f"⚠️ Failed in guild {guild_id}: {e}")
+    config = load_config()
+    channel_id = get_guild_channel_id(config.get(guild_id))
+    if channel_id is None:
+        return
+
+    channel = bot.get_channel(channel_id)
+    if channel is None:
+        log.warning("⚠️ UFO channel not found - skipping this drop", guild=guild_id, channel=channel_id)
+        return
 
-        # Each guild gets its own random interval
-        interval = get_random_interval()
-        await asyncio.sleep(interval)
+    # Get image with random effect applied (unless it was prepared ahead)
+    if image_content is None:
+        image_content = await get_random_image_with_effect(guild_id)
+    try:
+        # Send either URL string or Discord File
+        if isinstance(image_content, str):
+            message = await outbound.send(PRIORITY_POST, channel_route(channel), lambda: channel.send(image_content))
+            image_url = image_content
+        else:  # Discord File object
+            message = await outbound.send(PRIORITY_POST, channel_route(channel), lambda: channel.send(file=image_content))
+            image_url = f"[Processed UFO Image with effects]"
+        
+        # Track this message ID so we know it's from the bot even after deletion
+        bot_ufo_messages.track(message.id, guild_id)
+        # The reaper deletes the message and expires tracking later
+        bot_ufo_messages.schedule_delete(message)
+        log.info("📤 Sent UFO image - now tracking for reactions", guild=guild_id, message=message.id)
+        
+        # Log image sending to global channel
+        await log_image_sent(channel, message, image_url)
+        
+        await outbound.send(PRIORITY_POST, channel_route(channel), lambda: message.add_reaction("👽"))
+        log.debug("🤖 Bot added 👽 reaction to UFO message", message=message.id)
+        return message.id
+    except discord.HTTPException as e:
+        log.warning("⚠️ Failed to post UFO image", guild=guild_id, error=e)
+
+async def prepare_post(guild_id: str):
+    """Pick and render a guild's next UFO image ahead of its drop."""
+    return await get_random_image_with_effect(guild_id)
+
+# One scheduler drives UFO drops for every configured guild
+post_scheduler = PostingScheduler(post_to_guild, prepare_callback=prepare_post)
+metrics.gauge("ufo_posting_queue_depth", "Due UFO drops waiting for a posting worker", collect=lambda: post_scheduler.due_count)
+# Config saves (like /setchannel) add or remove guilds from the schedule
+add_config_listener(post_scheduler.sync_config)
 
 @bot.event
 async def on_ready():
     """Called when the bot is ready."""
-    print(f"🤖 Bot is online as {bot.user.name}")
+    log.info("🤖 Bot is online", user=bot.user.name)
     
     # Load ban commands cog
     from commands import load_ban_commands
@@ -168,22 +212,35 @@ async def on_ready():
     activity = discord.Activity(type=discord.ActivityType.watching, name="for Aliens")
     await bot.change_presence(status=discord.Status.dnd, activity=activity)
     
-    try:
-        synced = await bot.tree.sync()
-        print(f"Slash commands synced: {len(synced)} commands")
-        for cmd in synced:
-            print(f"  - /{cmd.name}: {cmd.description}")
-    except Exception as e:
-        print(f"Failed to sync commands: {e}")
+    # Slash commands are global, so only the first cluster syncs them
+    if get_cluster_id() == 0:
+        try:
+            synced = await bot.tree.sync()
+            log.info("Slash commands synced", count=len(synced))
+            for cmd in synced:
+                log.debug("Synced slash command", name=cmd.name, description=cmd.description)
+        except Exception as e:
+            log.error("Failed to sync commands", error=e)
+
+    log.info("🧩 Running shards", shards=bot.shard_count)
+
+    # Processed images are uploaded once to the asset channel (it may be on another shard)
+    asset_channel_id = get_asset_channel_id()
+    if asset_channel_id:
+        cdn_cache.set_asset_channel(bot.get_partial_messageable(asset_channel_id))
 
-    # Start a separate task for each guild
-    for g in bot.guilds:
-        bot.loop.create_task(send_images_to_guild(str(g.id)))
+    # Schedule configured guilds on our shards that we're in, drop the rest
+    post_scheduler.set_shards(bot.shard_count, bot.shard_ids)
+    # (existing schedules are kept, never duplicated)
+    post_scheduler.set_member_guilds(str(g.id) for g in bot.guilds)
 
 @bot.event
 async def on_guild_join(guild):
     """Send welcome message when bot joins a new server."""
-    print(f"🌟 Joined new guild: {guild.name} (ID: {guild.id})")
+    log.info("🌟 Joined new guild", guild=guild.id, name=guild.name)
+    
+    # Start posting right away if this guild was configured before
+    post_scheduler.add_guild(str(guild.id))
     
     # Create welcome embed
     welcome_embed = create_welcome_embed()
@@ -210,31 +267,55 @@ async def on_guild_join(guild):
     if target_channel:
         try:
             await target_channel.send(embed=welcome_embed)
-            print(f"✅ Sent welcome message to {guild.name} in #{target_channel.name}")
+            log.info("✅ Sent welcome message", guild=guild.id, channel=target_channel.name)
         except discord.HTTPException as e:
-            print(f"❌ Failed to send welcome message to {guild.name}: {e}")
+            log.warning("❌ Failed to send welcome message", guild=guild.id, error=e)
     else:
-        print(f"⚠️ No suitable channel found in {guild.name} to send welcome message")
+        log.warning("⚠️ No suitable channel found to send welcome message", guild=guild.id)
+
+@bot.listen("on_interaction")
+async def count_interaction(interaction: discord.Interaction):
+    """Count interactions per shard for /botinfo event rates."""
+    if interaction.guild_id:
+        shard_stats.record(shard_for_guild(interaction.guild_id, bot.shard_count or 1))
+
+@bot.event
+async def on_guild_remove(guild):
+    """Stop posting to a server the bot was removed from."""
+    log.info("👋 Removed from guild", guild=guild.id, name=guild.name)
+    post_scheduler.remove_guild(str(guild.id))
 
 @bot.event
 async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
     """Handle reaction tracking for UFO sightings."""
-    # Debug logging
-    print(f"🔍 Reaction detected: {payload.emoji} by user {payload.user_id} on message {payload.message_id}")
+    with reaction_latency.time():
+        await handle_reaction(payload)
+
+async def handle_reaction(payload: discord.RawReactionActionEvent):
+    """Credit a sighting for a reaction to one of the bot's UFO messages."""
+    # Count gateway events per shard for /botinfo
+    if payload.guild_id:
+        shard_stats.record(shard_for_guild(payload.guild_id, bot.shard_count or 1))
+    
+    log.debug("🔍 Reaction detected", emoji=payload.emoji, user=payload.user_id, message=payload.message_id)
+    
+    # The bot's own 👽 on each drop must not use up the guild's reaction bucket
+    if payload.user_id == bot.user.id:
+        return
+    
+    # Drop reaction floods before touching any files
+    if rate_limiter.retry_after("reaction", payload.user_id, payload.guild_id):
+        return
     
     # Check if user is banned from using the bot
-    if is_user_banned(payload.user_id):
-        print(f"🚫 Banned user {payload.user_id} attempted to react - ignoring")
+    if await run_state_call(is_user_banned, payload.user_id):
+        log.debug("🚫 Banned user attempted to react - ignoring", user=payload.user_id)
         return
     
     # Accept any emoji, not just alien emoji (this was the bug!)
     # Original code only tracked 👽 but users react with any emoji
     # if str(payload.emoji) != "👽":
     #     return
-    
-    if payload.user_id == bot.user.id:
-        print(f"⏭️ Skipping bot's own reaction")
-        return
 
     # Prevent duplicate reactions within 5 seconds
     import time
@@ -245,7 +326,7 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
     if reaction_key in recent_reactions:
         time_diff = current_time - recent_reactions[reaction_key]
         if time_diff < 5:  # 5 second window
-            print(f"🔄 Duplicate reaction detected (within {time_diff:.1f}s) - skipping")
+            log.debug("🔄 Duplicate reaction - skipping", user=payload.user_id, seconds=round(time_diff, 1))
             return
     
     # Record this reaction
@@ -257,53 +338,45 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
 
     channel = bot.get_channel(payload.channel_id)
     if channel is None:
-        print(f"❌ Channel {payload.channel_id} not found")
+        log.debug("❌ Reaction channel not found", channel=payload.channel_id)
         return
 
     # Check if this message is in our tracked UFO messages (even if deleted)
     is_bot_ufo_message = payload.message_id in bot_ufo_messages
     
-    if is_bot_ufo_message:
-        # This is definitely one of our UFO messages (even if deleted now)
-        print(f"✅ Reaction to tracked UFO message {payload.message_id} (deleted: likely)")
-    else:
+    # Tracked messages are definitely ours (even if deleted now)
+    if not is_bot_ufo_message:
         # Try to fetch the message to verify it's from the bot
         try:
             message = await channel.fetch_message(payload.message_id)
             if message.author.id != bot.user.id:
-                print(f"⏭️ Skipping reaction to non-bot message from {message.author.id}")
+                log.debug("⏭️ Skipping reaction to non-bot message", message=payload.message_id)
                 return
-            print(f"✅ Found message from bot, content: {message.content[:50]}...")
         except discord.NotFound:
             # Message was deleted and we don't have it tracked - skip it
-            print(f"⏭️ Skipping reaction to deleted untracked message {payload.message_id}")
+            log.debug("⏭️ Skipping reaction to deleted untracked message", message=payload.message_id)
             return
         except Exception as e:
-            print(f"❌ Could not fetch message {payload.message_id}: {e}")
+            log.warning("❌ Could not fetch reacted message", message=payload.message_id, error=e)
+            return
+
+    # In unique spotter mode each user is credited at most once per UFO drop
+    if payload.guild_id and get_guild_setting(payload.guild_id, "unique_spotters", False):
+        tracked = bot_ufo_messages.get(payload.message_id)
+        if tracked is None:
+            tracked = bot_ufo_messages.track(payload.message_id, str(payload.guild_id))
+        if not tracked.credit_spotter(payload.user_id):
+            log.debug("🔂 User already credited for this drop - skipping", user=payload.user_id, message=payload.message_id)
             return
 
     user_id = str(payload.user_id)
     guild_id = str(payload.guild_id) if payload.guild_id else "dm"
 
-    # Load current reactions data from file
-    reactions_data = load_reactions()
-    if guild_id not in reactions_data:
-        reactions_data[guild_id] = {}
-    
-    # Check current count before incrementing
-    current_count = reactions_data[guild_id].get(user_id, 0)
-    print(f"📊 User {user_id} current count: {current_count} -> {current_count + 1}")
-    
-    if user_id not in reactions_data[guild_id]:
-        reactions_data[guild_id][user_id] = 0
-
-    reactions_data[guild_id][user_id] += 1
-    # Save updated data back to file
-    save_reactions(reactions_data)
-    
-    # Console log with more detail
-    print(f"👽 SIGHTING TRACKED! Reaction by {user_id} in guild {guild_id}. Total: {reactions_data[guild_id][user_id]}")
-    print(f"   Emoji: {payload.emoji}, Message ID: {payload.message_id}")
+    # Add the sighting (atomic when processes share the state backend)
+    total_count = await run_state_call(increment_reaction, guild_id, user_id)
+    sightings_recorded.inc()
+    log.info("👽 Sighting tracked", user=user_id, guild=guild_id, total=total_count,
+             emoji=payload.emoji, message=payload.message_id)
     
     # Create log embed (used for both per-server and global logging)
     if payload.guild_id:  # Only for guild messages, not DMs
@@ -334,7 +407,7 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
         
         log_embed.add_field(
             name="📊 Total Count",
-            value=f"**{reactions_data[guild_id][user_id]}** sightings",
+            value=f"**{total_count}** sightings",
             inline=True
         )
         
@@ -357,11 +430,18 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
     if global_log_channel_id:
         global_log_channel = bot.get_channel(global_log_channel_id)
         if global_log_channel:
-            try:
-                await global_log_channel.send(embed=log_embed)
-                print(f"   ✅ Logged to global channel")
-            except Exception as e:
-                print(f"Failed to send log to global log channel: {e}")# Set up all command modules
+            outbound.send_later(
+                PRIORITY_BACKGROUND, channel_route(global_log_channel),
+                lambda: global_log_channel.send(embed=log_embed), "sighting log"
+            )
+
+# Commands reach the running services through the bot; importing this module
+# again (it is __main__ when run directly) would create unstarted copies
+bot.ufo_messages = bot_ufo_messages
+bot.log_image_sent = log_image_sent
+bot.post_scheduler = post_scheduler
+
+# Set up all command modules
 setup_all_commands(bot, bot_start_time)
 
 if __name__ == "__main__":
@@ -1,7 +1,11 @@
 """
 Make utils a package.
 """
-from .config import load_config, save_config, load_reactions, save_reactions, get_global_log_channel_id, set_global_log_channel_id
+from .config import (
+    load_config, save_config, load_reactions, save_reactions, increment_reaction, get_global_log_channel_id, set_global_log_channel_id,
+    get_guild_setting, set_guild_setting, add_config_listener, get_guild_channel_id,
+    get_asset_channel_id, set_asset_channel_id
+)
 from .helpers import IMAGE_URLS, INTERVALS, get_random_image, get_random_interval, format_uptime, create_welcome_embed, get_random_image_with_effect
 from .auth import (
     load_authorized_users, save_authorized_users, is_admin_user, 
@@ -13,8 +17,9 @@ from .tickets import (
 )
 
 __all__ = [
-    'load_config', 'save_config', 'load_reactions', 'save_reactions',
-    'get_global_log_channel_id', 'set_global_log_channel_id',
+    'load_config', 'save_config', 'load_reactions', 'save_reactions', 'increment_reaction',
+    'get_global_log_channel_id', 'set_global_log_channel_id', 'get_guild_setting', 'set_guild_setting',
+    'add_config_listener', 'get_guild_channel_id', 'get_asset_channel_id', 'set_asset_channel_id',
     'IMAGE_URLS', 'INTERVALS', 'get_random_image', 'get_random_interval', 'format_uptime', 'create_welcome_embed', 'get_random_image_with_effect',
     'load_authorized_users', 'save_authorized_users', 'is_admin_user',
     'add_admin_user', 'remove_admin_user', 'get_admin_users',
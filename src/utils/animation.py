@@ -0,0 +1,111 @@
+"""
+Animated "glitch" effects for the UFO Sighting Bot.
+Frames are generated with vectorized NumPy transforms of one decoded image
+(scanlines, jittered bands, colour split and static) and encoded as an
+animated GIF or WebP. Like the static effects, renders run in the process pool.
+"""
+import io
+import time
+
+import numpy as np
+from PIL import Image
+
+from .effects import EncodedImage, apply_effect, load_rgb, map_file
+
+# Longest edge of an animation (frames are much more expensive than stills)
+ANIMATION_MAX_EDGE = 480
+
+# Frame count limits and per-frame display time (in milliseconds)
+MAX_FRAMES = 16
+FRAME_DURATION = 80
+
+# "GIF" plays everywhere; "WEBP" is smaller but slower to encode
+ANIMATION_FORMAT = "GIF"
+
+# Target size of an encoded animation (in bytes); larger ones are shrunk and retried
+ANIMATION_BYTE_BUDGET = 4 * 1024 * 1024
+MAX_SHRINK_ATTEMPTS = 3
+
+# Defaults for the animation settings an effect can give
+DEFAULT_ANIMATION = {
+    "frames": 12,
+    "scanlines": 0.3,  # How much every other row is darkened
+    "jitter": 16,      # Largest sideways shift of a glitched band (in pixels)
+    "bands": 3,        # Glitched bands per frame
+    "split": 4,        # Largest red/blue channel offset (in pixels)
+    "static": 0.25,    # Chance of a frame having a burst of static
+    "seed": 0
+}
+
+
+def glitch_frames(pixels, settings):
+    """Generate glitch frames from an HxWx3 uint8 array."""
+    settings = {**DEFAULT_ANIMATION, **settings}
+    rng = np.random.default_rng(settings["seed"])
+    height, width, _ = pixels.shape
+    rows = np.arange(height)
+    columns = np.arange(width)
+    frames = []
+    for index in range(max(1, min(int(settings["frames"]), MAX_FRAMES))):
+        # Horizontal bands shifted sideways, as one gather over a per-row offset
+        shifts = np.zeros(height, dtype=np.int64)
+        jitter = int(settings["jitter"])
+        for _ in range(int(settings["bands"])):
+            top = rng.integers(0, height)
+            bottom = min(height, top + rng.integers(2, max(3, height // 8)))
+            shifts[top:bottom] = rng.integers(-jitter, jitter + 1)
+        frame = pixels[rows[:, None], (columns[None, :] - shifts[:, None]) % width]
+
+        # Red and blue pulled apart a little
+        split = int(settings["split"])
+        if split:
+            offset = int(rng.integers(-split, split + 1))
+            frame[..., 0] = np.roll(frame[..., 0], offset, axis=1)
+            frame[..., 2] = np.roll(frame[..., 2], -offset, axis=1)
+
+        # Rolling scanlines (alternate rows darkened, phase flips every frame)
+        shade = np.where((rows + index) % 2, 1.0 - settings["scanlines"], 1.0).astype(np.float32)
+        frame = frame * shade[:, None, None]
+
+        # Occasional burst of static over a band of rows
+        if rng.random() < settings["static"]:
+            top = rng.integers(0, height)
+            bottom = min(height, top + rng.integers(height // 10 + 1, height // 3 + 2))
+            noise = rng.integers(0, 256, size=(bottom - top, width, 1), dtype=np.uint8)
+            frame[top:bottom] = frame[top:bottom] * 0.4 + noise * 0.6
+
+        frames.append(Image.fromarray(frame.astype(np.uint8), "RGB"))
+    return frames
+
+def _encode_frames(frames):
+    if ANIMATION_FORMAT == "GIF":
+        # Quantizing each frame separately is very slow; the frames share
+        # nearly all their colours, so map them all to the first frame's palette
+        palette = frames[0].quantize(256, method=Image.Quantize.FASTOCTREE)
+        frames = [frame.quantize(palette=palette, dither=Image.Dither.NONE) for frame in frames]
+    buffer = io.BytesIO()
+    frames[0].save(
+        buffer, format=ANIMATION_FORMAT, save_all=True, append_images=frames[1:],
+        duration=FRAME_DURATION, loop=0
+    )
+    return buffer.getvalue()
+
+def _render_animation(img, stages, settings):
+    start = time.perf_counter()
+    img = apply_effect(img, stages)
+    data = None
+    for _ in range(MAX_SHRINK_ATTEMPTS):
+        data = _encode_frames(glitch_frames(np.asarray(img), settings))
+        if len(data) <= ANIMATION_BYTE_BUDGET:
+            break
+        img = img.resize((max(1, img.width * 3 // 4), max(1, img.height * 3 // 4)), Image.LANCZOS)
+    return EncodedImage(data, ANIMATION_FORMAT, None, time.perf_counter() - start)
+
+def render_animated_effect(image_data, stages, settings):
+    """Render an animated effect from encoded image bytes."""
+    return _render_animation(load_rgb(io.BytesIO(image_data), ANIMATION_MAX_EDGE), stages, settings)
+
+def render_file_animated_effect(path, stages, settings):
+    """Render an animated effect from an image file, read through a memory map."""
+    with map_file(path) as mapped:
+        return _render_animation(load_rgb(mapped, ANIMATION_MAX_EDGE), stages, settings)
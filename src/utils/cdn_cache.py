@@ -0,0 +1,150 @@
+"""
+Attachment URL cache for the UFO Sighting Bot.
+Each rendered variant is uploaded once to an asset channel; later posts
+send its Discord CDN URL instead of uploading the bytes again.
+"""
+import asyncio
+import io
+import json
+import os
+import time
+from urllib.parse import urlparse, parse_qs
+
+import discord
+
+from .dispatch import outbound, channel_route, PRIORITY_POST
+from .log import get_logger
+from .state import get_state_backend, run_state_call
+
+log = get_logger(__name__)
+
+CDN_CACHE_FILE = "data/cdn_cache.json"
+
+# Refresh signed URLs this long before Discord says they expire (in seconds)
+EXPIRY_MARGIN = 60 * 60
+
+
+def attachment_expiry(url):
+    """Get the expiry time of a signed Discord CDN URL, or None if it has none."""
+    expires = parse_qs(urlparse(url).query).get("ex")
+    if not expires:
+        return None
+    try:
+        return int(expires[0], 16)
+    except ValueError:
+        return None
+
+def load_cdn_cache():
+    """Load uploaded variant URLs from the JSON file (or the shared state backend)."""
+    backend = get_state_backend()
+    if backend is not None:
+        return backend.load_hash("cdn_cache")
+    if not os.path.exists(CDN_CACHE_FILE):
+        return {}
+    try:
+        with open(CDN_CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return {}
+
+def save_cdn_entry(content_hash, entry, entries):
+    """Save one uploaded variant URL."""
+    backend = get_state_backend()
+    if backend is not None:
+        backend.set_field("cdn_cache", content_hash, entry)
+        return
+    with open(CDN_CACHE_FILE, 'w') as f:
+        json.dump(entries, f, indent=4)
+
+
+class CdnCache:
+    """Maps variant content hashes to the CDN URL of their uploaded copy.
+
+    Entries record the asset message they came from, so when a signed URL
+    is close to expiry the message is fetched again for a fresh URL. If the
+    message is gone, the variant is uploaded again.
+    """
+
+    def __init__(self):
+        self.asset_channel = None
+        self._entries = None
+        self._locks = {}
+        self.uploads = 0
+        self.reused = 0
+
+    def set_asset_channel(self, channel):
+        """Set where variants are uploaded (None posts them as files every time)."""
+        self.asset_channel = channel
+
+    def _is_fresh(self, entry):
+        expires_at = entry.get("expires_at")
+        return expires_at is None or time.time() < expires_at - EXPIRY_MARGIN
+
+    async def get_url(self, variant):
+        """Get a CDN URL for a rendered variant, uploading it if needed.
+
+        Returns None when there's no asset channel or the upload fails.
+        """
+        if self.asset_channel is None:
+            return None
+        if self._entries is None:
+            self._entries = await run_state_call(load_cdn_cache)
+
+        entry = self._entries.get(variant.content_hash)
+        if entry is not None and self._is_fresh(entry):
+            self.reused += 1
+            return entry["url"]
+
+        # One upload or refresh per variant, even with several posts due at once
+        lock = self._locks.setdefault(variant.content_hash, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(variant.content_hash)
+            if entry is not None and self._is_fresh(entry):
+                self.reused += 1
+                return entry["url"]
+            try:
+                message = None
+                if entry is not None and entry.get("channel_id") == self.asset_channel.id:
+                    message = await self._refresh(entry)
+                if message is None:
+                    message = await self._upload(variant)
+            except discord.HTTPException as e:
+                log.warning("⚠️ Failed to upload UFO variant to asset channel", error=e)
+                return None
+            finally:
+                self._locks.pop(variant.content_hash, None)
+
+            url = message.attachments[0].url
+            entry = {
+                "url": url,
+                "channel_id": message.channel.id,
+                "message_id": message.id,
+                "expires_at": attachment_expiry(url)
+            }
+            self._entries[variant.content_hash] = entry
+            await run_state_call(save_cdn_entry, variant.content_hash, entry, self._entries)
+            return url
+
+    async def _refresh(self, entry):
+        """Fetch an asset message again for a freshly signed URL."""
+        channel = self.asset_channel
+        try:
+            message = await outbound.send(
+                PRIORITY_POST, channel_route(channel), lambda: channel.fetch_message(entry["message_id"])
+            )
+        except discord.NotFound:
+            return None
+        return message if message.attachments else None
+
+    async def _upload(self, variant):
+        channel = self.asset_channel
+        message = await outbound.send(
+            PRIORITY_POST, channel_route(channel),
+            lambda: channel.send(file=discord.File(io.BytesIO(variant.data), filename=variant.filename))
+        )
+        self.uploads += 1
+        return message
+
+
+# Shared attachment URL cache
+cdn_cache = CdnCache()
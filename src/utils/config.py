@@ -1,12 +1,21 @@
 """
 Configuration management utilities for the UFO Sighting Bot.
 """
+import copy
 import json
 import os
+from .metrics import storage_flush
+from .state import get_state_backend
 
 CONFIG_FILE = "data/config.json"
 REACTIONS_FILE = "data/reactions.json"
 
+# Callbacks run with the new config every time it is saved
+config_listeners = []
+
+# In-memory copy of the config for hot paths (reactions, effect picks)
+_cached_config = None
+
 def load_config():
     """Load server configuration from JSON file."""
     if not os.path.exists(CONFIG_FILE):
@@ -14,30 +23,80 @@ def load_config():
     with open(CONFIG_FILE, "r") as f:
         return json.load(f)
 
+def get_cached_config():
+    """Get the config without touching the disk (read once, then kept current on save).
+
+    The returned dict is shared, so callers must not modify it.
+    """
+    global _cached_config
+    if _cached_config is None:
+        _cached_config = load_config()
+    return _cached_config
+
+def _update_cached_config(config):
+    global _cached_config
+    # Copied so later edits to the caller's dict don't leak in unsaved
+    _cached_config = copy.deepcopy(config)
+
+config_listeners.append(_update_cached_config)
+
 def save_config(config):
     """Save server configuration to JSON file."""
     # Ensure data directory exists
     os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
     with open(CONFIG_FILE, "w") as f:
         json.dump(config, f, indent=4)
+    for listener in config_listeners:
+        listener(config)
+
+def add_config_listener(listener):
+    """Register a callback that receives the config whenever it is saved."""
+    config_listeners.append(listener)
+
+def get_guild_channel_id(guild_config):
+    """Get the UFO image channel ID from a guild config entry."""
+    # Handle both old format (integer) and new format (dictionary)
+    if isinstance(guild_config, dict):
+        return guild_config.get("channel_id")
+    return guild_config
 
 def load_reactions():
-    """Load reaction tracking data from JSON file."""
+    """Load reaction tracking data from JSON file (or the shared state backend)."""
+    backend = get_state_backend()
+    if backend is not None:
+        return backend.load_counters()
     if not os.path.exists(REACTIONS_FILE):
         return {}
     with open(REACTIONS_FILE, "r") as f:
         return json.load(f)
 
 def save_reactions(data):
-    """Save reaction tracking data to JSON file."""
+    """Save reaction tracking data to JSON file (or the shared state backend)."""
+    backend = get_state_backend()
+    if backend is not None:
+        backend.save_counters(data)
+        return
     # Ensure data directory exists
     os.makedirs(os.path.dirname(REACTIONS_FILE), exist_ok=True)
     with open(REACTIONS_FILE, "w") as f:
         json.dump(data, f, indent=4)
 
+def increment_reaction(guild_id, user_id):
+    """Add one sighting for a user in a guild and return their new total."""
+    backend = get_state_backend()
+    with storage_flush.time("reactions"):
+        if backend is not None:
+            # Atomic, so processes sharing the backend never lose counts
+            return backend.increment_counter(guild_id, user_id)
+        data = load_reactions()
+        guild_data = data.setdefault(guild_id, {})
+        guild_data[user_id] = guild_data.get(user_id, 0) + 1
+        save_reactions(data)
+        return guild_data[user_id]
+
 def get_global_log_channel_id():
     """Get the global logging channel ID that logs activity from all servers."""
-    config = load_config()
+    config = get_cached_config()
     return config.get("global_log_channel_id")
 
 def set_global_log_channel_id(channel_id):
@@ -48,11 +107,42 @@ def set_global_log_channel_id(channel_id):
 
 def get_global_log_channel_id():
     """Get the global logging channel ID that receives logs from all servers."""
-    config = load_config()
+    config = get_cached_config()
     return config.get("global_log_channel_id")
 
 def set_global_log_channel_id(channel_id):
     """Set the global logging channel ID for all servers."""
     config = load_config()
     config["global_log_channel_id"] = channel_id
-    save_config(config)
\ No newline at end of file
+    save_config(config)
+
+def get_asset_channel_id():
+    """Get the channel that holds uploaded UFO image variants for reuse."""
+    config = load_config()
+    return config.get("asset_channel_id")
+
+def set_asset_channel_id(channel_id):
+    """Set the channel that holds uploaded UFO image variants for reuse."""
+    config = load_config()
+    config["asset_channel_id"] = channel_id
+    save_config(config)
+
+def get_guild_setting(guild_id, key, default=None):
+    """Get a per-guild setting (only new-format dictionary configs have settings)."""
+    config = get_cached_config()
+    guild_config = config.get(str(guild_id))
+    if isinstance(guild_config, dict):
+        return guild_config.get(key, default)
+    return default
+
+def set_guild_setting(guild_id, key, value):
+    """Set a per-guild setting, converting old-format configs to the new format."""
+    config = load_config()
+    guild_id = str(guild_id)
+    if guild_id not in config:
+        config[guild_id] = {}
+    elif not isinstance(config[guild_id], dict):
+        # Convert old format to new format
+        config[guild_id] = {"channel_id": config[guild_id]}
+    config[guild_id][key] = value
+    save_config(config)
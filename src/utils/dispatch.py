@@ -0,0 +1,195 @@
+"""
+Outbound send dispatcher for the UFO Sighting Bot.
+Queues Discord REST calls by priority so background sends never delay user-facing ones.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+import discord
+
+from .log import get_logger
+from .metrics import metrics
+
+log = get_logger(__name__)
+
+# Priority classes (lower runs first)
+PRIORITY_INTERACTION = 0  # Sends a user is waiting on (support requests, ticket replies)
+PRIORITY_POST = 1         # UFO posts, their reactions and deletes
+PRIORITY_BACKGROUND = 2   # Log embeds and global broadcasts
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTION: "interaction",
+    PRIORITY_POST: "post",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Workers serving interaction and post sends
+FOREGROUND_WORKERS = 4
+
+# Background sends get their own worker so they can never occupy foreground ones
+BACKGROUND_WORKERS = 1
+
+# Max concurrent requests per route (Discord rate limits messages per channel)
+ROUTE_CONCURRENCY = 1
+
+# Random pause before each background send (in seconds) to spread bursts
+BACKGROUND_PACING = (0.2, 0.6)
+
+
+rest_latency = metrics.histogram(
+    "ufo_rest_request_seconds", "Discord REST call time once a worker picks it up", ("priority",)
+)
+rest_requests = metrics.counter("ufo_rest_requests_total", "Discord REST calls by outcome", ("priority", "outcome"))
+rest_rate_limited = metrics.counter("ufo_rest_rate_limited_total", "Discord REST calls that got HTTP 429")
+
+
+def channel_route(channel):
+    """Get the route key for sends to a channel."""
+    return f"channel:{channel.id}"
+
+def dm_route(user):
+    """Get the route key for direct messages to a user."""
+    return f"dm:{user.id}"
+
+
+class OutboundDispatcher:
+    """Priority queue in front of outbound Discord REST calls.
+
+    Each request is a zero-argument function returning the coroutine to run,
+    so it is only created once a worker picks it up. Interaction sends are
+    served before UFO post sends; background sends run on their own paced
+    worker. Requests to the same route are limited to ROUTE_CONCURRENCY at a
+    time: a request whose route is busy waits in that route's own queue
+    rather than holding a worker, and is queued again (keeping its place)
+    when the route frees up.
+    """
+
+    def __init__(self, foreground_workers=FOREGROUND_WORKERS, background_workers=BACKGROUND_WORKERS):
+        self._foreground_workers = foreground_workers
+        self._background_workers = background_workers
+        self._counter = itertools.count()
+        self._foreground = None
+        self._background = None
+        self._routes = {}  # route -> [requests running, heap of requests waiting]
+        self._tasks = []
+        self.queued = {name: 0 for name in PRIORITY_NAMES.values()}
+
+    def start(self):
+        """Start the worker tasks (safe to call more than once)."""
+        if self._tasks and not all(task.done() for task in self._tasks):
+            return
+        self._foreground = asyncio.PriorityQueue()
+        self._background = asyncio.Queue()
+        self._routes = {}
+        self._tasks = [
+            asyncio.create_task(self._run_worker(self._foreground))
+            for _ in range(self._foreground_workers)
+        ]
+        self._tasks += [
+            asyncio.create_task(self._run_worker(self._background, paced=True))
+            for _ in range(self._background_workers)
+        ]
+
+    def stop(self):
+        """Cancel the worker tasks."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def submit(self, priority, route, request):
+        """Queue a request and return a future for its result."""
+        future = asyncio.get_running_loop().create_future()
+        # The last value marks a request that already holds its route slot
+        item = (priority, next(self._counter), route, request, future, False)
+        self.queued[PRIORITY_NAMES[priority]] += 1
+        self._enqueue(item)
+        return future
+
+    def _enqueue(self, item):
+        if item[0] == PRIORITY_BACKGROUND:
+            self._background.put_nowait(item)
+        else:
+            self._foreground.put_nowait(item)
+
+    async def send(self, priority, route, request):
+        """Queue a request and wait for its result."""
+        return await self.submit(priority, route, request)
+
+    def send_later(self, priority, route, request, description="send"):
+        """Queue a request without waiting; failures are logged."""
+        future = self.submit(priority, route, request)
+
+        def log_failure(done):
+            if not done.cancelled() and done.exception() is not None:
+                log.warning("⚠️ Failed background send", description=description, error=done.exception())
+
+        future.add_done_callback(log_failure)
+        return future
+
+    async def _run_worker(self, queue, paced=False):
+        while True:
+            item = await queue.get()
+            priority, _, route, request, future, holds_route = item
+            try:
+                if not holds_route and not self._acquire_route(route, item):
+                    continue  # Parked until the route frees up
+                self.queued[PRIORITY_NAMES[priority]] -= 1
+                try:
+                    if future.cancelled():
+                        continue
+                    if paced:
+                        await asyncio.sleep(random.uniform(*BACKGROUND_PACING))
+                    await self._run(priority, request, future)
+                finally:
+                    self._release_route(route)
+            finally:
+                queue.task_done()
+
+    def _acquire_route(self, route, item):
+        """Take a slot on the route, or park the request there. Returns True if taken."""
+        slot = self._routes.get(route)
+        if slot is None:
+            slot = self._routes[route] = [0, []]
+        if slot[0] < ROUTE_CONCURRENCY:
+            slot[0] += 1
+            return True
+        heapq.heappush(slot[1], item)
+        return False
+
+    def _release_route(self, route):
+        """Hand the slot to the route's next parked request, or free it."""
+        slot = self._routes[route]
+        if slot[1]:
+            # The slot passes straight to the next request so nothing overtakes it
+            self._enqueue(heapq.heappop(slot[1])[:5] + (True,))
+            return
+        slot[0] -= 1
+        # Forget idle routes so the map only holds routes in use
+        if slot[0] == 0:
+            del self._routes[route]
+
+    async def _run(self, priority, request, future):
+        name = PRIORITY_NAMES[priority]
+        started = time.perf_counter()
+        try:
+            result = await request()
+            rest_requests.inc(name, "sent")
+            if not future.done():
+                future.set_result(result)
+        except Exception as e:
+            rest_requests.inc(name, "failed")
+            if isinstance(e, discord.HTTPException) and e.status == 429:
+                rest_rate_limited.inc()
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            rest_latency.observe(time.perf_counter() - started, name)
+
+
+# Shared dispatcher for all outbound sends
+outbound = OutboundDispatcher()
+
+metrics.gauge("ufo_send_queue_depth", "Outbound sends waiting to run", ("priority",), collect=lambda: outbound.queued)
@@ -0,0 +1,194 @@
+"""
+Image effect registry for the UFO Sighting Bot.
+Named effects built from composable stages, with odds that servers can tune.
+"""
+import json
+import os
+import random
+
+from .config import get_guild_setting, add_config_listener
+from .effects import STAGES
+from .log import get_logger
+
+log = get_logger(__name__)
+
+EFFECTS_FILE = "data/effects.json"
+
+# Built-in effects: name -> {"stages": [[stage, *params], ...], "weight": odds}
+# Effects with an "animation" (settings from animation.DEFAULT_ANIMATION) are
+# rendered as animated glitch transmissions after their stages are applied.
+# An effect with no stages and no animation posts the image unchanged
+DEFAULT_EFFECTS = {
+    "normal": {"stages": [], "weight": 60},
+    "invert": {"stages": [["invert"]], "weight": 15},
+    # Green tint (alien theme)
+    "greenscale": {
+        "stages": [["grayscale"], ["saturation", 0.3], ["tint", [0, 255, 0], 0.2]],
+        "weight": 10
+    },
+    # Sepia/vintage look
+    "vintage": {"stages": [["grayscale"], ["tint", [255, 218, 185], 0.3]], "weight": 10},
+    "enhanced": {"stages": [["contrast", 1.5], ["brightness", 1.2]], "weight": 5},
+    # Animated transmissions (off by default; servers opt in with /effectodds
+    # since they are heavier to render and upload)
+    "glitch": {"stages": [], "animation": {}, "weight": 0},
+    "alienglitch": {
+        "stages": [["grayscale"], ["tint", [0, 255, 0], 0.3]],
+        "animation": {"jitter": 24, "static": 0.4},
+        "weight": 0
+    },
+}
+
+# Alias tables kept for distinct weightings (servers mostly share a few)
+MAX_ALIAS_TABLES = 256
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(1) weighted sampling after O(n) setup."""
+    __slots__ = ("names", "probabilities", "aliases")
+
+    def __init__(self, weights):
+        self.names = [name for name, weight in weights.items() if weight > 0]
+        count = len(self.names)
+        if count == 0:
+            raise ValueError("at least one weight must be positive")
+        total = sum(weights[name] for name in self.names)
+        scaled = [weights[name] * count / total for name in self.names]
+        self.probabilities = [1.0] * count
+        self.aliases = list(range(count))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+
+    def sample(self):
+        """Pick a name with probability proportional to its weight."""
+        column = random.randrange(len(self.names))
+        if random.random() < self.probabilities[column]:
+            return self.names[column]
+        return self.names[self.aliases[column]]
+
+
+def load_effects():
+    """Load effects from JSON file, merged over the built-in effects.
+
+    Entries can add effects or change a built-in's stages, animation or
+    weight. Invalid effects are skipped.
+    """
+    effects = {name: dict(effect) for name, effect in DEFAULT_EFFECTS.items()}
+    if not os.path.exists(EFFECTS_FILE):
+        return effects
+    try:
+        with open(EFFECTS_FILE, "r") as f:
+            overrides = json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return effects
+    for name, effect in overrides.items():
+        merged = {"stages": [], "weight": 0, **effects.get(name, {}), **effect}
+        unknown = [stage[0] for stage in merged["stages"] if stage[0] not in STAGES]
+        if unknown:
+            log.warning("⚠️ Skipping effect with unknown stages", effect=name, stages=unknown)
+            continue
+        if merged.get("animation") is not None and not isinstance(merged["animation"], dict):
+            log.warning("⚠️ Skipping effect: animation must be an object of settings", effect=name)
+            continue
+        effects[name] = merged
+    return effects
+
+
+class EffectRegistry:
+    """The available effects and their odds, reloaded when the effects file changes."""
+
+    def __init__(self):
+        self.effects = {}
+        # False (not None, which means "no file") so the first call always loads
+        self._mtime = False
+        self._tables = {}
+        # guild_id -> its alias table (None when no effect has odds), until the config or effects change
+        self._guild_tables = {}
+
+    def reload_if_changed(self):
+        """Reload effects if the effects file was modified since the last load."""
+        try:
+            mtime = os.stat(EFFECTS_FILE).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        self.effects = load_effects()
+        self._tables = {}
+        self._guild_tables = {}
+
+    @property
+    def names(self):
+        return list(self.effects)
+
+    def stages(self, name):
+        """Get an effect's stages (empty for unknown effects)."""
+        effect = self.effects.get(name)
+        return effect["stages"] if effect else []
+
+    def animation(self, name):
+        """Get an effect's animation settings, or None for still effects."""
+        effect = self.effects.get(name)
+        return effect.get("animation") if effect else None
+
+    def is_passthrough(self, name):
+        """Check whether an effect leaves the image unchanged."""
+        return not self.stages(name) and self.animation(name) is None
+
+    def signature(self):
+        """A hashable summary of every effect's rendering, for cache invalidation."""
+        return tuple(sorted(
+            (name, json.dumps([effect["stages"], effect.get("animation")], sort_keys=True))
+            for name, effect in self.effects.items()
+        ))
+
+    def weights(self, guild_id=None):
+        """Get effect odds, with a server's overrides applied."""
+        weights = {name: effect["weight"] for name, effect in self.effects.items()}
+        if guild_id is not None:
+            for name, weight in (get_guild_setting(guild_id, "effect_weights") or {}).items():
+                if name in weights:
+                    weights[name] = weight
+        return weights
+
+    def forget_guild_odds(self, config=None):
+        """Drop the per-server tables so odds are read again (config listener)."""
+        self._guild_tables = {}
+
+    def _table(self, guild_id):
+        """Get the alias table for the (server's) odds, or None if nothing has odds."""
+        weights = self.weights(guild_id)
+        key = tuple(sorted(weights.items()))
+        if key in self._tables:
+            return self._tables[key]
+        if len(self._tables) >= MAX_ALIAS_TABLES:
+            self._tables.clear()
+        table = AliasTable(weights) if any(weight > 0 for weight in weights.values()) else None
+        self._tables[key] = table
+        return table
+
+    def pick(self, guild_id=None):
+        """Pick a random effect name using the (server's) odds."""
+        self.reload_if_changed()
+        guild_key = str(guild_id) if guild_id is not None else None
+        if guild_key in self._guild_tables:
+            table = self._guild_tables[guild_key]
+        else:
+            table = self._guild_tables[guild_key] = self._table(guild_id)
+        if table is None:
+            return "normal"
+        return table.sample()
+
+
+# Shared effect registry
+effect_registry = EffectRegistry()
+# /effectodds saves the config, which changes a server's odds
+add_config_listener(effect_registry.forget_guild_odds)
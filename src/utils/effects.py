@@ -0,0 +1,244 @@
+"""
+Image effect rendering for the UFO Sighting Bot.
+Renders take encoded bytes and return picklable results so they can run in
+worker processes off the event loop.
+
+Each effect is a chain of named stages fused into a single colour matrix,
+applied in one pass (as a lookup table when channels don't mix), so no
+full-size intermediate images are allocated.
+"""
+import io
+import math
+import mmap
+import time
+from PIL import Image
+
+# Bump when effect output changes so cached renders are thrown away
+EFFECT_VERSION = 4
+
+# Longest edge of a rendered image (larger images are downscaled)
+MAX_EDGE = 1600
+
+# Target size of an encoded render (in bytes)
+OUTPUT_BYTE_BUDGET = 1024 * 1024
+
+# Lossy format for photographic renders ("WEBP" is smaller but much slower to encode)
+PHOTO_FORMAT = "JPEG"
+
+# Quality range searched when fitting the byte budget
+MIN_QUALITY = 40
+MAX_QUALITY = 90
+
+# Images with at most this many colours (in a small thumbnail) are flat artwork,
+# encoded losslessly as PNG. Grayscale photos can have 256, so stay well below
+PHOTO_MIN_COLOURS = 64
+
+FILE_EXTENSIONS = {"PNG": "png", "JPEG": "jpg", "WEBP": "webp", "GIF": "gif"}
+
+# ITU-R 601-2 luma weights (what Image.convert("L") uses)
+LUMA = (0.299, 0.587, 0.114)
+
+# --- Effect stages ---
+# Every stage is an affine colour transform, built as a 3x4 matrix of
+# [r, g, b, offset] rows. A chain of stages composes into one matrix, so any
+# effect is applied in a single Image.convert pass (which also clips).
+# Stage builders get the image's current per-channel means first, for
+# stages (like contrast) that depend on the image.
+
+IDENTITY = [[1.0 if i == j else 0.0 for j in range(3)] + [0.0] for i in range(3)]
+
+def _blend_rows(weight, rows, other_rows):
+    """weight * rows + (1 - weight) * other_rows."""
+    return [
+        [weight * a + (1 - weight) * b for a, b in zip(row, other)]
+        for row, other in zip(rows, other_rows)
+    ]
+
+def _grayscale_rows():
+    return [list(LUMA) + [0.0] for _ in range(3)]
+
+def grayscale_stage(means):
+    """Replace every channel with the luma."""
+    return _grayscale_rows()
+
+def saturation_stage(means, factor):
+    """Blend with the grayscale image (0 is gray, 1 is unchanged)."""
+    return _blend_rows(factor, IDENTITY, _grayscale_rows())
+
+def tint_stage(means, colour, amount):
+    """Blend with a solid colour."""
+    solid = [[0.0, 0.0, 0.0, float(channel)] for channel in colour]
+    return _blend_rows(1 - amount, IDENTITY, solid)
+
+def invert_stage(means):
+    """255 - x on every channel."""
+    return [[-1.0 if i == j else 0.0 for j in range(3)] + [255.0] for i in range(3)]
+
+def contrast_stage(means, factor):
+    """Scale distance from the image's mean gray."""
+    mean = int(sum(weight * channel for weight, channel in zip(LUMA, means)) + 0.5)
+    return [[factor if i == j else 0.0 for j in range(3)] + [mean * (1 - factor)] for i in range(3)]
+
+def brightness_stage(means, factor):
+    """Scale every channel."""
+    return [[factor if i == j else 0.0 for j in range(3)] + [0.0] for i in range(3)]
+
+# Stage name -> builder; effects are lists of [stage name, *params]
+STAGES = {
+    "grayscale": grayscale_stage,
+    "saturation": saturation_stage,
+    "tint": tint_stage,
+    "invert": invert_stage,
+    "contrast": contrast_stage,
+    "brightness": brightness_stage,
+}
+
+# Stages that need the image's channel means
+MEAN_STAGES = {"contrast"}
+
+def _compose(outer, inner):
+    """The matrix applying inner, then outer."""
+    return [
+        [sum(outer[i][k] * inner[k][j] for k in range(3)) for j in range(3)]
+        + [sum(outer[i][k] * inner[k][3] for k in range(3)) + outer[i][3]]
+        for i in range(3)
+    ]
+
+def _transform(matrix, means):
+    return [sum(row[k] * means[k] for k in range(3)) + row[3] for row in matrix]
+
+def channel_means(img):
+    """Per-channel means from the histogram, without copying the image."""
+    histogram = img.histogram()
+    pixels = img.width * img.height or 1
+    return [
+        sum(value * count for value, count in enumerate(histogram[band * 256:(band + 1) * 256])) / pixels
+        for band in range(3)
+    ]
+
+def fuse_stages(stages, means=(128.0, 128.0, 128.0)):
+    """Compose a list of stages into one 12-tuple colour matrix."""
+    matrix = IDENTITY
+    means = list(means)
+    for name, *params in stages:
+        stage = STAGES[name](means, *params)
+        matrix = _compose(stage, matrix)
+        means = _transform(stage, means)
+    return tuple(value for row in matrix for value in row)
+
+def _matrix_lut(matrix):
+    """Per-channel lookup table for a matrix with no cross-channel terms."""
+    lut = []
+    for channel in range(3):
+        scale, offset = matrix[channel * 4 + channel], matrix[channel * 4 + 3]
+        lut.extend(max(0, min(255, int(scale * value + offset + 0.5))) for value in range(256))
+    return lut
+
+def apply_effect(img, stages):
+    """Apply an effect's stages to an RGB image in a single pass."""
+    if not stages:
+        return img
+    means = channel_means(img) if any(stage[0] in MEAN_STAGES for stage in stages) else (128.0, 128.0, 128.0)
+    matrix = fuse_stages(stages, means)
+    # Channels that don't mix are cheaper as a lookup table than a matrix
+    if all(matrix[row * 4 + column] == 0 for row in range(3) for column in range(3) if row != column):
+        return img.point(_matrix_lut(matrix))
+    return img.convert("RGB", matrix)
+
+class EncodedImage:
+    """Encoded render bytes and how they were produced."""
+    __slots__ = ("data", "format", "quality", "encode_time")
+
+    def __init__(self, data, format, quality, encode_time):
+        self.data = data
+        self.format = format
+        self.quality = quality
+        self.encode_time = encode_time
+
+    @property
+    def extension(self):
+        return FILE_EXTENSIONS[self.format]
+
+def is_photographic(img):
+    """Guess whether an image is a photo (many colours) or flat artwork."""
+    # Nearest-neighbour sampling reads 64x64 pixels without copying the image
+    sample = img.resize((64, 64), Image.NEAREST)
+    return sample.getcolors(PHOTO_MIN_COLOURS) is None
+
+def _encode(img, format, quality=None):
+    buffer = io.BytesIO()
+    if format == "PNG":
+        img.save(buffer, format="PNG", optimize=True)
+    else:
+        img.save(buffer, format=format, quality=quality)
+    return buffer.getvalue()
+
+def encode_image(img, budget=OUTPUT_BYTE_BUDGET):
+    """Encode an image as small as it needs to be to fit the byte budget.
+
+    Flat images are tried as PNG first. Photos (or PNGs over budget) use
+    PHOTO_FORMAT with the highest quality that fits, found by binary search;
+    if nothing fits, the lowest quality is used.
+    """
+    start = time.perf_counter()
+    if not is_photographic(img):
+        data = _encode(img, "PNG")
+        if len(data) <= budget:
+            return EncodedImage(data, "PNG", None, time.perf_counter() - start)
+
+    # Most renders fit at full quality, so try that before searching
+    data = _encode(img, PHOTO_FORMAT, MAX_QUALITY)
+    if len(data) <= budget:
+        return EncodedImage(data, PHOTO_FORMAT, MAX_QUALITY, time.perf_counter() - start)
+
+    low, high = MIN_QUALITY, MAX_QUALITY - 1
+    best = None
+    while low <= high:
+        quality = (low + high) // 2
+        data = _encode(img, PHOTO_FORMAT, quality)
+        if len(data) <= budget:
+            best = (data, quality)
+            low = quality + 1
+        else:
+            high = quality - 1
+    if best is None:
+        # The search ends on MIN_QUALITY when nothing fits
+        best = (data, MIN_QUALITY)
+    return EncodedImage(best[0], PHOTO_FORMAT, best[1], time.perf_counter() - start)
+
+def load_rgb(fp, max_edge=MAX_EDGE):
+    """Decode an image to RGB, downscaled to fit within max_edge."""
+    with Image.open(fp) as img:
+        # JPEGs can be decoded at 1/2, 1/4 or 1/8 scale, which is far cheaper
+        # than decoding at full size and shrinking afterwards. The draft size
+        # must keep the aspect ratio: a square box makes the short edge decide
+        # the scale and leaves the image decoded far larger than needed
+        if img.format == "JPEG" and max(img.size) > max_edge:
+            scale = max_edge / max(img.size)
+            img.draft('RGB', (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+
+        # Convert to RGB if necessary
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        # Downscale before any effect so it touches fewer pixels
+        if max(img.size) > max_edge:
+            img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        # Make sure pixels are read before the file closes
+        img.load()
+        return img
+
+def map_file(path):
+    """Open a file as a read-only memory map (usable as a file object)."""
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def render_effect(image_data, stages):
+    """Apply an effect's stages to encoded image bytes and return an EncodedImage."""
+    return encode_image(apply_effect(load_rgb(io.BytesIO(image_data)), stages))
+
+def render_file_effect(path, stages):
+    """Apply an effect's stages to an image file, read through a memory map."""
+    with map_file(path) as mapped:
+        return encode_image(apply_effect(load_rgb(mapped), stages))
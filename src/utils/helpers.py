@@ -4,13 +4,19 @@ Helper utilities and constants for the UFO Sighting Bot.
 import random
 import discord
 import io
-import aiohttp
 import json
 import os
-from PIL import Image, ImageOps, ImageEnhance
 from datetime import datetime
+from .state import get_state_backend
+from .variants import variant_cache
+from .cdn_cache import cdn_cache
+from .library import image_library, is_library_source
+from .effect_registry import effect_registry
+from .log import get_logger
 
-# UFO image URLs
+log = get_logger(__name__)
+
+# UFO image URLs (used when the local library in assets/ufos/ is empty)
 IMAGE_URLS = [
     "https://s.hdnux.com/photos/01/25/20/06/22348185/4/rawImage.jpg",
     "https://brobible.com/wp-content/uploads/2023/08/ufo-over-city-clouds.png",
@@ -23,89 +29,49 @@ IMAGE_URLS = [
 
 ]
 
-# Image effects that can be applied randomly
-IMAGE_EFFECTS = [""
-    "normal",      # 60% chance - no effect (most common)
-    "normal",
-    "normal", 
-    "normal",
-    "normal",
-    "normal",
-    "invert",      # 15% chance - invert colors
-    "invert",
-    "greenscale",  # 10% chance - green tint (alien theme) - reduced frequency
-    "vintage",     # 10% chance - sepia/vintage look
-    "enhanced"     # 5% chance - enhanced contrast/brightness
-]
-
 # Random intervals for image posting (in seconds) - Ultra-rare encounters
 INTERVALS = [2.5 * 60 * 60, 3 * 60 * 60, 3.5 * 60 * 60, 4 * 60 * 60]  # 2.5h, 3h, 3.5h, 4h
 
 async def apply_image_effect(image_url, effect):
     """Apply visual effects to UFO images for enhanced alien atmosphere."""
-    if effect == "normal":
+    if effect_registry.is_passthrough(effect) and not is_library_source(image_url):
         return image_url
     
     try:
-        # Download the image
-        async with aiohttp.ClientSession() as session:
-            async with session.get(image_url) as response:
-                if response.status != 200:
-                    return image_url  # Return original URL if download fails
-                
-                image_data = await response.read()
+        # Rendered variants are cached, so this is usually a memory lookup
+        variant = await variant_cache.get(image_url, effect)
+        if variant is None:
+            return image_url  # Return original URL if download fails
         
-        # Process the image with PIL
-        with Image.open(io.BytesIO(image_data)) as img:
-            # Convert to RGB if necessary
-            if img.mode in ('RGBA', 'LA', 'P'):
-                img = img.convert('RGB')
-            
-            # Apply the selected effect
-            if effect == "invert":
-                img = ImageOps.invert(img)
-            elif effect == "greenscale":
-                # Convert to grayscale then tint green (alien theme)
-                img = ImageOps.grayscale(img)
-                img = img.convert('RGB')
-                # Apply green tint
-                enhancer = ImageEnhance.Color(img)
-                img = enhancer.enhance(0.3)  # Reduce saturation
-                # Add green overlay
-                green_overlay = Image.new('RGB', img.size, (0, 255, 0))
-                img = Image.blend(img, green_overlay, 0.2)
-            elif effect == "vintage":
-                # Sepia/vintage effect
-                img = ImageOps.grayscale(img)
-                img = img.convert('RGB')
-                # Apply sepia tint
-                sepia_overlay = Image.new('RGB', img.size, (255, 218, 185))
-                img = Image.blend(img, sepia_overlay, 0.3)
-            elif effect == "enhanced":
-                # Enhance contrast and brightness
-                enhancer = ImageEnhance.Contrast(img)
-                img = enhancer.enhance(1.5)
-                enhancer = ImageEnhance.Brightness(img)
-                img = enhancer.enhance(1.2)
-            
-            # Save processed image to bytes
-            img_bytes = io.BytesIO()
-            img.save(img_bytes, format='PNG', quality=95)
-            img_bytes.seek(0)
-            
-            # Return the processed image as Discord file
-            return discord.File(img_bytes, filename=f"ufo_{effect}.png")
+        # Link the copy already uploaded to the asset channel when there is one
+        cdn_url = await cdn_cache.get_url(variant)
+        if cdn_url:
+            return cdn_url
+        
+        # Return the processed image as Discord file
+        return discord.File(io.BytesIO(variant.data), filename=variant.filename)
             
     except Exception as e:
-        print(f"⚠️ Failed to apply image effect '{effect}': {e}")
+        log.warning("⚠️ Failed to apply image effect", effect=effect, error=e)
+        if is_library_source(image_url):
+            return discord.File(image_library.path(image_url))  # Send the original file
         return image_url  # Return original URL if processing fails
 
-async def get_random_image_with_effect():
-    """Get a random UFO image with a randomly applied effect."""
-    base_url = random.choice(IMAGE_URLS)
-    effect = random.choice(IMAGE_EFFECTS)
+def get_image_sources():
+    """Get the local library's images, or IMAGE_URLS if the library is empty."""
+    # Picks up manifest edits without a restart
+    image_library.reload_if_changed()
+    return image_library.sources if image_library else IMAGE_URLS
+
+async def get_random_image_with_effect(guild_id=None):
+    """Get a random UFO image with a randomly applied effect (using the server's odds)."""
+    # Keep the variant cache in step with the current images and effects
+    variant_cache.configure(get_image_sources())
+    
+    base_url = image_library.pick() if image_library else random.choice(IMAGE_URLS)
+    effect = effect_registry.pick(guild_id)
     
-    print(f"🎨 Applying effect '{effect}' to UFO image")
+    log.debug("🎨 Applying effect to UFO image", effect=effect, image=base_url)
     
     # Apply effect and return either URL or Discord File
     return await apply_image_effect(base_url, effect)
@@ -188,7 +154,10 @@ def create_welcome_embed():
 BANNED_USERS_FILE = "data/banned.json"
 
 def load_banned_users():
-    """Load banned users from the JSON file."""
+    """Load banned users from the JSON file (or the shared state backend)."""
+    backend = get_state_backend()
+    if backend is not None:
+        return backend.load_hash("banned")
     if not os.path.exists(BANNED_USERS_FILE):
         return {}
     
@@ -200,28 +169,39 @@ def load_banned_users():
         return {}
 
 def save_banned_users(banned_users):
-    """Save banned users to the JSON file."""
+    """Save banned users to the JSON file (or the shared state backend)."""
+    backend = get_state_backend()
+    if backend is not None:
+        backend.save_hash("banned", banned_users)
+        return
     data = {"banned_users": banned_users}
     with open(BANNED_USERS_FILE, 'w') as f:
         json.dump(data, f, indent=4)
 
 def is_user_banned(user_id):
     """Check if a user is banned."""
-    banned_users = load_banned_users()
-    return str(user_id) in banned_users
+    return get_ban_info(user_id) is not None
 
 def ban_user(user_id, reason="No reason provided", banned_by=None):
     """Ban a user with reason and timestamp."""
-    banned_users = load_banned_users()
-    banned_users[str(user_id)] = {
+    ban_info = {
         "reason": reason,
         "banned_at": datetime.now().isoformat(),
         "banned_by": str(banned_by) if banned_by else "Unknown"
     }
+    backend = get_state_backend()
+    if backend is not None:
+        backend.set_field("banned", str(user_id), ban_info)
+        return
+    banned_users = load_banned_users()
+    banned_users[str(user_id)] = ban_info
     save_banned_users(banned_users)
 
 def unban_user(user_id):
     """Unban a user."""
+    backend = get_state_backend()
+    if backend is not None:
+        return backend.delete_field("banned", str(user_id))
     banned_users = load_banned_users()
     user_id_str = str(user_id)
     if user_id_str in banned_users:
@@ -232,5 +212,8 @@ def unban_user(user_id):
 
 def get_ban_info(user_id):
     """Get ban information for a user."""
+    backend = get_state_backend()
+    if backend is not None:
+        return backend.get_field("banned", str(user_id))
     banned_users = load_banned_users()
     return banned_users.get(str(user_id), None)
\ No newline at end of file
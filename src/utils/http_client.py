@@ -0,0 +1,117 @@
+"""
+HTTP client utilities for the UFO Sighting Bot.
+One long-lived, connection-pooled aiohttp session shared by all image downloads.
+"""
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+# Request timeouts (in seconds)
+TOTAL_TIMEOUT = 15
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 10
+
+# Largest response body we accept (in bytes)
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+# Connection pool limits
+MAX_CONNECTIONS = 20
+MAX_CONNECTIONS_PER_HOST = 4
+KEEPALIVE_SECONDS = 60
+DNS_CACHE_SECONDS = 300
+
+
+class ResponseTooLarge(Exception):
+    """Raised when a response body exceeds the size limit."""
+
+
+class UnexpectedContentType(Exception):
+    """Raised when a successful response isn't one of the expected content types."""
+
+
+class RequestTiming:
+    """Request count and timing totals for one host."""
+    __slots__ = ("requests", "failures", "total_seconds", "last_seconds")
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.last_seconds = 0.0
+
+    @property
+    def average_seconds(self):
+        return self.total_seconds / self.requests if self.requests else 0.0
+
+
+class HttpClient:
+    """Shared aiohttp session with per-host keepalive, timeouts and a body size cap."""
+
+    def __init__(self):
+        self._session = None
+        self.timings = {}  # host -> RequestTiming
+
+    async def start(self):
+        """Create the session (safe to call more than once)."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=MAX_CONNECTIONS,
+                limit_per_host=MAX_CONNECTIONS_PER_HOST,
+                keepalive_timeout=KEEPALIVE_SECONDS,
+                ttl_dns_cache=DNS_CACHE_SECONDS
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=TOTAL_TIMEOUT, connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def close(self):
+        """Close the session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def fetch(self, url, headers=None, max_bytes=MAX_BODY_BYTES, content_types=None):
+        """GET a URL and return (status, body bytes, response headers).
+
+        Raises ResponseTooLarge if the body is bigger than max_bytes, and
+        UnexpectedContentType if a 200 response's Content-Type doesn't start
+        with one of content_types. Both are checked from the headers before
+        the body is read. Connection failures and timeouts raise the usual
+        aiohttp/asyncio errors.
+        """
+        session = await self.start()
+        host = urlsplit(url).hostname or ""
+        timing = self.timings.get(host)
+        if timing is None:
+            timing = self.timings[host] = RequestTiming()
+
+        started = time.perf_counter()
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.content_length is not None and response.content_length > max_bytes:
+                    raise ResponseTooLarge(f"{url} is {response.content_length} bytes (limit {max_bytes})")
+                if content_types and response.status == 200 and not response.content_type.startswith(content_types):
+                    raise UnexpectedContentType(f"{url} returned {response.content_type}")
+
+                # Read in chunks so an oversized body without a length header is cut off early
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    body.extend(chunk)
+                    if len(body) > max_bytes:
+                        raise ResponseTooLarge(f"{url} is over the {max_bytes} byte limit")
+                return response.status, bytes(body), response.headers
+        except Exception:
+            timing.failures += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            timing.requests += 1
+            timing.total_seconds += elapsed
+            timing.last_seconds = elapsed
+
+
+# Shared client for the whole bot
+http_client = HttpClient()
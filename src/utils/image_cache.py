@@ -0,0 +1,165 @@
+"""
+Image byte cache for the UFO Sighting Bot.
+A memory LRU backed by an on-disk cache, revalidated with ETag/Last-Modified.
+"""
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+from .http_client import http_client
+from .log import get_logger
+
+log = get_logger(__name__)
+
+IMAGE_CACHE_DIR = "data/image_cache"
+
+# Memory budget for cached image bytes
+MEMORY_CACHE_BYTES = 64 * 1024 * 1024
+
+# Entries older than this are revalidated with a conditional request (in seconds)
+REVALIDATE_AFTER = 24 * 60 * 60
+
+# Largest image we download (in bytes)
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+# Responses must have one of these Content-Type prefixes
+IMAGE_CONTENT_TYPES = ("image/",)
+
+
+class CachedImage:
+    """Downloaded image bytes and the validators needed to revalidate them."""
+    __slots__ = ("data", "etag", "last_modified", "fetched_at")
+
+    def __init__(self, data, etag=None, last_modified=None, fetched_at=0.0):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def is_fresh(self, now):
+        return now - self.fetched_at < REVALIDATE_AFTER
+
+
+class ImageCache:
+    """Two-tier cache of image bytes keyed by URL.
+
+    Lookups check memory, then disk, then the origin. Entries past
+    REVALIDATE_AFTER are revalidated with If-None-Match/If-Modified-Since;
+    if the origin is down or returns an error, the stale bytes are served.
+    """
+
+    def __init__(self, cache_dir=IMAGE_CACHE_DIR, memory_budget=MEMORY_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.memory_budget = memory_budget
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_served = 0
+
+    async def get(self, url):
+        """Get an image's bytes, or None if it can't be fetched and isn't cached."""
+        now = time.time()
+        entry = self._memory.get(url)
+        if entry is not None:
+            self._memory.move_to_end(url)
+        else:
+            entry = self._load_from_disk(url)
+            if entry is not None:
+                self._remember(url, entry)
+
+        if entry is not None and entry.is_fresh(now):
+            self.hits += 1
+            return entry.data
+        self.misses += 1
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        try:
+            status, body, response_headers = await http_client.fetch(
+                url, headers=headers, max_bytes=MAX_IMAGE_BYTES, content_types=IMAGE_CONTENT_TYPES
+            )
+        except Exception as e:
+            log.warning("⚠️ Failed to fetch image", url=url, error=e)
+            return self._serve_stale(entry)
+
+        if status == 304 and entry is not None:
+            entry.fetched_at = now
+            self._save_to_disk(url, entry, write_data=False)
+            return entry.data
+        if status != 200:
+            log.warning("⚠️ Image download failed", url=url, status=status)
+            return self._serve_stale(entry)
+
+        entry = CachedImage(
+            body,
+            etag=response_headers.get("ETag"),
+            last_modified=response_headers.get("Last-Modified"),
+            fetched_at=now
+        )
+        self._remember(url, entry)
+        self._save_to_disk(url, entry)
+        return entry.data
+
+    def _serve_stale(self, entry):
+        if entry is None:
+            return None
+        self.stale_served += 1
+        return entry.data
+
+    def _remember(self, url, entry):
+        """Add an entry to the memory LRU, evicting the least recently used."""
+        old = self._memory.pop(url, None)
+        if old is not None:
+            self._memory_bytes -= len(old.data)
+        self._memory[url] = entry
+        self._memory_bytes += len(entry.data)
+        while self._memory_bytes > self.memory_budget and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.data)
+
+    def _paths(self, url):
+        name = hashlib.sha256(url.encode()).hexdigest()
+        return (
+            os.path.join(self.cache_dir, f"{name}.bin"),
+            os.path.join(self.cache_dir, f"{name}.json")
+        )
+
+    def _load_from_disk(self, url):
+        data_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            with open(data_path, "rb") as f:
+                data = f.read()
+        except (OSError, json.JSONDecodeError):
+            return None
+        return CachedImage(data, meta.get("etag"), meta.get("last_modified"), meta.get("fetched_at", 0.0))
+
+    def _save_to_disk(self, url, entry, write_data=True):
+        data_path, meta_path = self._paths(url)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if write_data:
+                with open(data_path, "wb") as f:
+                    f.write(entry.data)
+            with open(meta_path, "w") as f:
+                json.dump({
+                    "url": url,
+                    "etag": entry.etag,
+                    "last_modified": entry.last_modified,
+                    "fetched_at": entry.fetched_at
+                }, f)
+        except OSError as e:
+            log.warning("⚠️ Failed to write image cache", url=url, error=e)
+
+
+# Shared image cache
+image_cache = ImageCache()
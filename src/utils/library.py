@@ -0,0 +1,147 @@
+"""
+Local UFO image library for the UFO Sighting Bot.
+Images live under assets/ufos/ and are listed in a manifest with their
+dimensions, hash and weight. Renders memory-map the files directly, so no
+network is needed and image bytes aren't held in the bot's memory.
+"""
+import hashlib
+import json
+import os
+import random
+
+from PIL import Image
+
+from .log import get_logger
+
+log = get_logger(__name__)
+
+LIBRARY_DIR = "assets/ufos"
+MANIFEST_FILE = os.path.join(LIBRARY_DIR, "manifest.json")
+
+# Image sources from the library look like "library:<file name>"
+LIBRARY_PREFIX = "library:"
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+
+
+def is_library_source(source):
+    """Check whether an image source refers to the local library."""
+    return source.startswith(LIBRARY_PREFIX)
+
+def file_sha256(path):
+    """Hash a file in chunks without reading it all into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(manifest_file=MANIFEST_FILE):
+    """Load the library manifest, or an empty one if there is none."""
+    if not os.path.exists(manifest_file):
+        return {"images": []}
+    try:
+        with open(manifest_file, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return {"images": []}
+
+def build_manifest(directory=LIBRARY_DIR):
+    """Scan a directory for images and build its manifest.
+
+    Weights already set in an existing manifest are kept; new images get 1.
+    Files Pillow can't open are skipped.
+    """
+    old_weights = {
+        entry["file"]: entry.get("weight", 1)
+        for entry in load_manifest(os.path.join(directory, "manifest.json"))["images"]
+    }
+    images = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with Image.open(path) as img:
+                width, height = img.size
+        except OSError as e:
+            log.warning("⚠️ Skipping unreadable image", file=name, error=e)
+            continue
+        images.append({
+            "file": name,
+            "width": width,
+            "height": height,
+            "bytes": os.path.getsize(path),
+            "sha256": file_sha256(path),
+            "weight": old_weights.get(name, 1)
+        })
+    return {"images": images}
+
+def save_manifest(manifest, manifest_file=MANIFEST_FILE):
+    """Save the library manifest."""
+    with open(manifest_file, 'w') as f:
+        json.dump(manifest, f, indent=4)
+
+
+class ImageLibrary:
+    """The images listed in the manifest, reloaded whenever it changes on disk."""
+
+    def __init__(self, directory=LIBRARY_DIR, manifest_file=MANIFEST_FILE):
+        self.directory = directory
+        self.manifest_file = manifest_file
+        self.entries = {}   # source -> manifest entry
+        self.sources = []
+        self._cum_weights = []
+        self._mtime = None
+
+    def __len__(self):
+        return len(self.sources)
+
+    def reload_if_changed(self):
+        """Reload the manifest if it was modified since the last load."""
+        try:
+            mtime = os.stat(self.manifest_file).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        self.load()
+
+    def load(self):
+        """Load the manifest, skipping entries whose files are missing."""
+        entries = {}
+        for entry in load_manifest(self.manifest_file)["images"]:
+            if entry.get("weight", 1) <= 0:
+                continue
+            if not os.path.exists(os.path.join(self.directory, entry["file"])):
+                log.warning("⚠️ Library image is in the manifest but missing on disk", file=entry["file"])
+                continue
+            entries[LIBRARY_PREFIX + entry["file"]] = entry
+
+        self.entries = entries
+        self.sources = list(entries)
+        self._cum_weights = []
+        total = 0
+        for entry in entries.values():
+            total += entry.get("weight", 1)
+            self._cum_weights.append(total)
+        if entries:
+            log.info("📚 Loaded images from the local library", images=len(entries))
+
+    def pick(self):
+        """Pick a random library image source, honouring weights."""
+        return random.choices(self.sources, cum_weights=self._cum_weights)[0]
+
+    def content_hash(self, source):
+        """Get the manifest's sha256 of a library image source (None if unknown)."""
+        entry = self.entries.get(source)
+        return entry.get("sha256") if entry else None
+
+    def path(self, source):
+        """Get the file path of a library image source."""
+        return os.path.join(self.directory, source[len(LIBRARY_PREFIX):])
+
+
+# Shared image library
+image_library = ImageLibrary()
@@ -0,0 +1,157 @@
+"""
+Logging for the UFO Sighting Bot.
+Structured key=value log lines written by a background thread, never on the event loop.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+
+# Parent of every bot logger (kept separate from discord.py's own logging)
+ROOT_LOGGER = "ufo"
+
+# Default level, e.g. LOG_LEVEL=WARNING in production
+DEFAULT_LEVEL = "INFO"
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s %(message)s"
+
+
+def _parse_pairs(value):
+    """Parse "name=value,name=value" into a dict."""
+    pairs = {}
+    for item in (value or "").split(","):
+        name, _, setting = item.partition("=")
+        if name.strip() and setting.strip():
+            pairs[name.strip()] = setting.strip()
+    return pairs
+
+
+def _format_value(value):
+    text = str(value)
+    if not text or any(c in text for c in ' ="\n'):
+        return json.dumps(text, ensure_ascii=False)
+    return text
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Formats a record's message followed by its fields as key=value pairs."""
+
+    def formatMessage(self, record):
+        fields = getattr(record, "fields", None)
+        if not fields:
+            return record.message
+        return record.message + " " + " ".join(f"{key}={_format_value(value)}" for key, value in fields.items())
+
+
+class StructuredLogger:
+    """A logger taking key=value fields, e.g. log.info("Posted", guild=guild_id).
+
+    Disabled levels return before a record is built, and DEBUG lines can be
+    sampled so only a fraction of them are kept.
+    """
+    __slots__ = ("_logger", "sample_rate")
+
+    def __init__(self, logger):
+        self._logger = logger
+        self.sample_rate = 1.0
+
+    def _log(self, level, message, fields, exc_info=False):
+        if not self._logger.isEnabledFor(level):
+            return
+        if level <= logging.DEBUG and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        self._logger.log(level, message, exc_info=exc_info, extra={"fields": fields}, stacklevel=3)
+
+    def debug(self, message, /, **fields):
+        self._log(logging.DEBUG, message, fields)
+
+    def info(self, message, /, **fields):
+        self._log(logging.INFO, message, fields)
+
+    def warning(self, message, /, **fields):
+        self._log(logging.WARNING, message, fields)
+
+    def error(self, message, /, **fields):
+        self._log(logging.ERROR, message, fields)
+
+    def exception(self, message, /, **fields):
+        """Log at ERROR with the current exception's traceback."""
+        self._log(logging.ERROR, message, fields, exc_info=True)
+
+
+_loggers = {}  # module name -> StructuredLogger
+_sample_rates = {}  # module name prefix -> fraction of DEBUG lines kept
+_listener = None
+_listening = False
+
+
+def _sample_rate(name):
+    """The sampling rate of the closest configured module (or parent package)."""
+    while name:
+        if name in _sample_rates:
+            return _sample_rates[name]
+        name = name.rpartition(".")[0]
+    return 1.0
+
+
+def get_logger(name):
+    """Get the logger for a module (pass __name__)."""
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers[name] = StructuredLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"))
+        logger.sample_rate = _sample_rate(name)
+    return logger
+
+
+def setup_logging():
+    """Configure levels and sampling from the environment and queue all bot logging.
+
+    LOG_LEVEL sets the default level, LOG_LEVELS overrides it per module
+    (e.g. "ufo_main=DEBUG,utils.variants=WARNING") and LOG_SAMPLE keeps a
+    fraction of a module's DEBUG lines (e.g. "ufo_main=0.1"). Records wait in
+    the queue until start_logging() starts the writer thread.
+    """
+    global _listener
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(os.getenv("LOG_LEVEL", DEFAULT_LEVEL).upper())
+    root.propagate = False
+    for name, level in _parse_pairs(os.getenv("LOG_LEVELS")).items():
+        logging.getLogger(f"{ROOT_LOGGER}.{name}").setLevel(level.upper())
+
+    _sample_rates.clear()
+    for name, rate in _parse_pairs(os.getenv("LOG_SAMPLE")).items():
+        try:
+            _sample_rates[name] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            continue
+    for name, logger in _loggers.items():
+        logger.sample_rate = _sample_rate(name)
+
+    if _listener is None:
+        records = queue.SimpleQueue()
+        # Fields are formatted into the message before it is queued
+        handler = logging.handlers.QueueHandler(records)
+        handler.setFormatter(KeyValueFormatter())
+        root.addHandler(handler)
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(logging.Formatter(LOG_FORMAT))
+        _listener = logging.handlers.QueueListener(records, output)
+
+
+def start_logging():
+    """Start the thread that writes queued records (call after forking workers)."""
+    global _listening
+    if _listener is not None and not _listening:
+        _listener.start()
+        _listening = True
+
+
+def stop_logging():
+    """Write any queued records and stop the writer thread."""
+    global _listening
+    if _listening:
+        _listener.stop()
+        _listening = False
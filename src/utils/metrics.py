@@ -0,0 +1,262 @@
+"""
+Metrics for the UFO Sighting Bot.
+Counters, gauges and histograms kept in memory and served in Prometheus text format.
+"""
+import asyncio
+import bisect
+import math
+import os
+import time
+
+import psutil
+from aiohttp import web
+
+from .log import get_logger
+
+log = get_logger(__name__)
+
+# The endpoint only listens locally; each cluster process adds its CLUSTER_ID to the port
+METRICS_HOST = "127.0.0.1"
+DEFAULT_METRICS_PORT = 9464
+
+# Latency buckets (in seconds)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# How often the event loop lag is sampled (in seconds)
+LOOP_LAG_INTERVAL = 0.5
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A value that only goes up, optionally split by label values."""
+    kind = "counter"
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values = {}  # label values -> total
+
+    def inc(self, *label_values, amount=1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        """A series' total, or the sum of every series without label values."""
+        if label_values:
+            return self._values.get(label_values, 0)
+        return sum(self._values.values())
+
+    def samples(self):
+        for label_values, value in self._values.items():
+            yield self.name + _format_labels(self.labels, label_values), value
+
+
+class Gauge:
+    """A value read from a function when metrics are collected.
+
+    The function returns a number, or a dict of label values -> number.
+    """
+    kind = "gauge"
+
+    def __init__(self, name, description, labels=(), collect=None):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.collect = collect
+
+    def samples(self):
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for label_values, value in values.items():
+            if not isinstance(label_values, tuple):
+                label_values = (label_values,)
+            yield self.name + _format_labels(self.labels, label_values), value
+
+
+class _Timer:
+    __slots__ = ("histogram", "label_values", "started")
+
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.label_values)
+        return False
+
+
+class Histogram:
+    """Observations counted into buckets, optionally split by label values."""
+    kind = "histogram"
+
+    def __init__(self, name, description, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [per-bucket counts (last is +Inf), sum, count]
+
+    def observe(self, value, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def time(self, *label_values):
+        """Context manager observing how long its block took."""
+        return _Timer(self, label_values)
+
+    def _merged(self, label_values):
+        if label_values:
+            series = self._series.get(label_values)
+            return series if series is not None else [[0] * (len(self.buckets) + 1), 0.0, 0]
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        count = 0
+        for series in self._series.values():
+            counts = [a + b for a, b in zip(counts, series[0])]
+            total += series[1]
+            count += series[2]
+        return [counts, total, count]
+
+    def count(self, *label_values):
+        """Observations in a series, or in every series without label values."""
+        return self._merged(label_values)[2]
+
+    def quantile(self, q, *label_values):
+        """Estimate a quantile from the buckets (like Prometheus' histogram_quantile)."""
+        counts, _, count = self._merged(label_values)
+        if count == 0:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def samples(self):
+        bounds = self.buckets + (math.inf,)
+        for label_values, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_number(bound)}"'
+                yield self.name + "_bucket" + _format_labels(self.labels, label_values, le), cumulative
+            yield self.name + "_sum" + _format_labels(self.labels, label_values), total
+            yield self.name + "_count" + _format_labels(self.labels, label_values), count
+
+
+class MetricsRegistry:
+    """Every metric the bot records, plus the local endpoint serving them."""
+
+    def __init__(self):
+        self._metrics = {}  # name -> metric
+        self._runner = None
+        self._lag_task = None
+
+    def _register(self, cls, name, *args, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        return metric
+
+    def counter(self, name, description, labels=()):
+        return self._register(Counter, name, description, labels)
+
+    def gauge(self, name, description, labels=(), collect=None):
+        return self._register(Gauge, name, description, labels, collect)
+
+    def histogram(self, name, description, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, description, labels, buckets)
+
+    def render(self):
+        """All metrics in Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            try:
+                for sample, value in metric.samples():
+                    lines.append(f"{sample} {_format_number(value)}")
+            except Exception as e:
+                log.warning("⚠️ Failed to collect metric", metric=metric.name, error=e)
+        return "\n".join(lines) + "\n"
+
+    async def _serve_metrics(self, request):
+        return web.Response(text=self.render(), content_type="text/plain", charset="utf-8")
+
+    async def start(self):
+        """Serve /metrics locally (METRICS_PORT=0 disables it) and watch event loop lag."""
+        if self._lag_task is None:
+            self._lag_task = asyncio.create_task(self._watch_loop_lag())
+        port = int(os.getenv("METRICS_PORT", DEFAULT_METRICS_PORT))
+        if port == 0 or self._runner is not None:
+            return
+        port += int(os.getenv("CLUSTER_ID", 0))
+        app = web.Application()
+        app.router.add_get("/metrics", self._serve_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, METRICS_HOST, port).start()
+        except OSError as e:
+            log.warning("⚠️ Could not start the metrics endpoint", port=port, error=e)
+            await runner.cleanup()
+            return
+        self._runner = runner
+        log.info("📈 Serving metrics", url=f"http://{METRICS_HOST}:{port}/metrics")
+
+    async def stop(self):
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _watch_loop_lag(self):
+        """Measure how late the event loop wakes a sleeping task."""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            loop_lag.observe(max(0.0, time.perf_counter() - started - LOOP_LAG_INTERVAL))
+
+
+# Shared metrics registry
+metrics = MetricsRegistry()
+
+loop_lag = metrics.histogram("ufo_event_loop_lag_seconds", "How late the event loop ran a task that was due")
+storage_flush = metrics.histogram("ufo_storage_flush_seconds", "Time spent writing state to disk or the state backend", ("store",))
+reaction_latency = metrics.histogram("ufo_reaction_handling_seconds", "Time to handle one reaction event")
+sightings_recorded = metrics.counter("ufo_sightings_total", "Sightings credited to users")
+
+_process = psutil.Process()
+metrics.gauge("ufo_process_resident_bytes", "Resident memory of the bot process", collect=lambda: _process.memory_info().rss)
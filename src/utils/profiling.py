@@ -0,0 +1,132 @@
+"""
+On-demand profiling for the UFO Sighting Bot.
+Runs cProfile (and optionally tracemalloc) on the event loop for a bounded time.
+"""
+import asyncio
+import cProfile
+import marshal
+import os
+import time
+import tracemalloc
+
+# Longest profiling session allowed (in seconds)
+MAX_PROFILE_SECONDS = 60
+DEFAULT_PROFILE_SECONDS = 10
+
+# Rows in the summary tables
+DEFAULT_TOP = 15
+
+# Stack frames kept per allocation (more frames make tracemalloc slower)
+TRACEMALLOC_FRAMES = 1
+
+# Longest function label in the summary table
+LABEL_WIDTH = 48
+
+SORT_KEYS = {
+    "cumulative": lambda row: row[3],  # time including calls it made
+    "own": lambda row: row[2],         # time in the function itself
+    "calls": lambda row: row[1],
+}
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profiling session is already running."""
+
+
+class ProfileResult:
+    """Summary tables and raw stats from one profiling session."""
+    __slots__ = ("seconds", "calls", "functions", "memory", "stats")
+
+    def __init__(self, seconds, calls, functions, memory, stats):
+        self.seconds = seconds
+        self.calls = calls
+        self.functions = functions  # formatted top-N function table
+        self.memory = memory        # formatted top-N allocation table, or None
+        self.stats = stats          # marshalled pstats data (load with pstats.Stats)
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == "~":
+        label = name  # built-in functions
+    else:
+        label = f"{os.path.basename(filename)}:{line}({name})"
+    return label if len(label) <= LABEL_WIDTH else "…" + label[-(LABEL_WIDTH - 1):]
+
+
+def format_function_table(stats, top=DEFAULT_TOP, sort="cumulative"):
+    """Format the top functions of cProfile stats as a fixed-width table."""
+    rows = [(func, calls, own, cumulative) for func, (_, calls, own, cumulative, _) in stats.items()]
+    rows.sort(key=SORT_KEYS[sort], reverse=True)
+    lines = [f"{'calls':>8} {'own ms':>9} {'cum ms':>9}  function"]
+    for func, calls, own, cumulative in rows[:top]:
+        lines.append(f"{calls:>8} {own * 1000:>9.1f} {cumulative * 1000:>9.1f}  {_label(func)}")
+    return "\n".join(lines)
+
+
+def format_memory_table(before, after, top=DEFAULT_TOP):
+    """Format the lines holding the most newly allocated memory between two snapshots."""
+    differences = [diff for diff in after.compare_to(before, "lineno") if diff.size_diff > 0]
+    lines = [f"{'KB':>9} {'blocks':>8}  line"]
+    for diff in differences[:top]:
+        frame = diff.traceback[0]
+        label = f"{os.path.basename(frame.filename)}:{frame.lineno}"
+        lines.append(f"{diff.size_diff / 1024:>9.1f} {diff.count_diff:>8}  {label}")
+    return "\n".join(lines)
+
+
+class Profiler:
+    """Profiles the event loop thread, one session at a time.
+
+    Only code running on the event loop is profiled; renders in the worker
+    processes show up as time spent awaiting them.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self):
+        return self._lock.locked()
+
+    async def run(self, seconds=DEFAULT_PROFILE_SECONDS, top=DEFAULT_TOP, sort="cumulative", memory=True):
+        """Profile for a number of seconds and return a ProfileResult.
+
+        Raises ProfilerBusy if a session is already running.
+        """
+        if self._lock.locked():
+            raise ProfilerBusy("a profiling session is already running")
+        seconds = max(1, min(seconds, MAX_PROFILE_SECONDS))
+        async with self._lock:
+            # Leave tracemalloc alone if something else already started it
+            started_tracing = memory and not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            before = tracemalloc.take_snapshot() if memory else None
+
+            profile = cProfile.Profile()
+            started = time.perf_counter()
+            profile.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+                elapsed = time.perf_counter() - started
+                after = tracemalloc.take_snapshot() if memory else None
+                if started_tracing:
+                    tracemalloc.stop()
+
+            profile.create_stats()
+            # Comparing snapshots can take a while, so keep it off the event loop
+            memory_table = await asyncio.to_thread(format_memory_table, before, after, top) if memory else None
+        return ProfileResult(
+            seconds=elapsed,
+            calls=sum(calls for _, calls, _, _, _ in profile.stats.values()),
+            functions=format_function_table(profile.stats, top, sort),
+            memory=memory_table,
+            stats=marshal.dumps(profile.stats)
+        )
+
+
+# Shared profiler (only one session runs at a time)
+profiler = Profiler()
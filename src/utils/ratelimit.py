@@ -0,0 +1,144 @@
+"""
+Rate limiting utilities for the UFO Sighting Bot.
+Per-user and per-guild token buckets shared by slash commands and reactions.
+"""
+import json
+import os
+import time
+
+RATE_LIMITS_FILE = "data/rate_limits.json"
+
+# Default limits: name -> scope -> [tokens per minute, burst size]
+# "default" applies to any command without its own entry
+DEFAULT_RATE_LIMITS = {
+    "default": {"user": [20, 5], "guild": [300, 50]},
+    "reaction": {"user": [30, 10], "guild": [600, 100]},
+    "alien": {"user": [4, 2], "guild": [30, 10]},
+    "support": {"user": [2, 2], "guild": [20, 5]},
+}
+
+# How often idle buckets are swept from memory (in seconds)
+SWEEP_INTERVAL = 60
+
+# Hard cap on tracked buckets so a raid of alts can't grow memory forever
+MAX_BUCKETS = 50000
+
+# Pre-built rejection message so throttled requests cost no extra work
+RATE_LIMITED_MESSAGE = (
+    "⏳ **Transmission Throttled**\n"
+    "You're sending signals too quickly, earthling. Please wait a moment and try again."
+)
+
+
+class TokenBucket:
+    """Token bucket state: available tokens and when they were last refilled."""
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens, updated):
+        self.tokens = tokens
+        self.updated = updated
+
+
+def load_rate_limits():
+    """Load rate limits from JSON file, merged over the defaults."""
+    limits = {name: dict(scopes) for name, scopes in DEFAULT_RATE_LIMITS.items()}
+    if not os.path.exists(RATE_LIMITS_FILE):
+        return limits
+    try:
+        with open(RATE_LIMITS_FILE, "r") as f:
+            overrides = json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return limits
+    for name, scopes in overrides.items():
+        limits.setdefault(name, {}).update(scopes)
+    return limits
+
+
+class RateLimiter:
+    """Per-user and per-guild token buckets kept in an expiring map."""
+
+    def __init__(self, limits=None, max_buckets=MAX_BUCKETS):
+        self.limits = limits if limits is not None else load_rate_limits()
+        self.max_buckets = max_buckets
+        self.rejected = 0
+        self._buckets = {}
+        self._next_sweep = time.monotonic() + SWEEP_INTERVAL
+
+    def reload(self):
+        """Reload limits from disk."""
+        self.limits = load_rate_limits()
+
+    def retry_after(self, name, user_id, guild_id=None):
+        """Take one token for a request. Returns 0 if allowed, else seconds to wait."""
+        now = time.monotonic()
+        if now >= self._next_sweep or len(self._buckets) > self.max_buckets:
+            self._sweep(now)
+
+        scopes = self.limits.get(name) or self.limits["default"]
+        checks = [(("user", name, user_id), scopes.get("user"))]
+        if guild_id is not None:
+            checks.append((("guild", name, guild_id), scopes.get("guild")))
+
+        # Refill every bucket first so a rejection doesn't consume any token
+        buckets = []
+        wait = 0
+        for key, limit in checks:
+            if not limit:
+                continue
+            rate = limit[0] / 60
+            burst = limit[1]
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(burst, now)
+                self._buckets[key] = bucket
+            else:
+                bucket.tokens = min(burst, bucket.tokens + (now - bucket.updated) * rate)
+                bucket.updated = now
+            if bucket.tokens < 1:
+                wait = max(wait, (1 - bucket.tokens) / rate)
+            buckets.append(bucket)
+
+        if wait:
+            self.rejected += 1
+            return wait
+
+        for bucket in buckets:
+            bucket.tokens -= 1
+        return 0
+
+    def _sweep(self, now):
+        """Drop buckets that have refilled completely (same as never seen)."""
+        for key in list(self._buckets):
+            scope, name, _ = key
+            limit = (self.limits.get(name) or self.limits["default"]).get(scope)
+            bucket = self._buckets[key]
+            if not limit or now - bucket.updated >= limit[1] * 60 / limit[0]:
+                del self._buckets[key]
+
+        # Still too many? Drop the longest idle buckets, leaving some headroom
+        if len(self._buckets) > self.max_buckets:
+            keep = self.max_buckets * 9 // 10
+            idle_first = sorted(self._buckets, key=lambda k: self._buckets[k].updated)
+            for key in idle_first[:len(self._buckets) - keep]:
+                del self._buckets[key]
+        self._next_sweep = now + SWEEP_INTERVAL
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+# Shared limiter used by commands and the reaction pipeline
+rate_limiter = RateLimiter()
+
+
+async def enforce_rate_limit(interaction, name):
+    """Check a slash command against the rate limiter.
+
+    Sends the cached rejection message and returns False if the user or
+    guild is over its limit, otherwise returns True.
+    """
+    guild_id = interaction.guild.id if interaction.guild else None
+    if not rate_limiter.retry_after(name, interaction.user.id, guild_id):
+        return True
+    await interaction.response.send_message(RATE_LIMITED_MESSAGE, ephemeral=True)
+    return False
@@ -0,0 +1,121 @@
+"""
+Image render pool for the UFO Sighting Bot.
+Runs CPU-heavy PIL work in worker processes so it never blocks the event loop.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .log import get_logger
+
+log = get_logger(__name__)
+
+# Worker processes rendering effects
+RENDER_WORKERS = min(2, os.cpu_count() or 1)
+
+# Renders allowed in flight at once (the rest wait their turn)
+MAX_CONCURRENT_RENDERS = 4
+
+# Give up on a render after this long and post the original URL (in seconds)
+RENDER_TIMEOUT = 15
+
+
+class RenderTimeout(Exception):
+    """A render took longer than RENDER_TIMEOUT."""
+
+
+def _warm_up():
+    """No-op run once so workers are forked before the bot starts other threads."""
+    return None
+
+
+class RenderPool:
+    """A bounded process pool for functions that take and return bytes."""
+
+    def __init__(self, workers=RENDER_WORKERS, max_concurrent=MAX_CONCURRENT_RENDERS, timeout=RENDER_TIMEOUT):
+        self.workers = workers
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self._executor = None
+        self._slots = None
+        self.completed = 0
+        self.timed_out = 0
+
+    def start(self):
+        """Create the worker processes."""
+        if self._executor is not None:
+            return
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._executor = self._create_executor()
+        self._executor.submit(_warm_up)
+
+    def stop(self):
+        """Shut the workers down without waiting on in-flight renders."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _create_executor(self, replacement=False):
+        # The first pool is forked before the bot starts other threads. Forking
+        # a replacement would copy a process already running aiohttp and
+        # executor threads, so replacements start their workers fresh
+        if not replacement and hasattr(os, "fork"):
+            method = "fork"
+        elif "forkserver" in multiprocessing.get_all_start_methods():
+            method = "forkserver"
+        else:
+            method = "spawn"
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+
+    def _replace_executor(self):
+        log.warning("⚠️ Render worker died - restarting render pool")
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._create_executor(replacement=True)
+        self._executor.submit(_warm_up)
+
+    async def run(self, func, *args):
+        """Run func(*args) in a worker and return its result.
+
+        Raises RenderTimeout if it takes longer than the timeout. Without a
+        started pool (e.g. in scripts) the work runs in a thread instead.
+        """
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            return await loop.run_in_executor(None, func, *args)
+
+        await self._slots.acquire()
+        executor = self._executor
+        try:
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._replace_executor()
+            raise
+
+        def release_slot(_):
+            # Usually called from the executor's thread, once the worker is really done
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._slots.release)
+
+        # A timed-out render keeps running in its worker, so it keeps its slot
+        # until it finishes rather than letting new renders pile up behind it
+        future.add_done_callback(release_slot)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise RenderTimeout(f"render took longer than {self.timeout}s")
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory) - replace the pool for next time
+            # (once, however many renders it failed)
+            if self._executor is executor:
+                self._replace_executor()
+            raise
+        self.completed += 1
+        return result
+
+
+# Shared render pool
+render_pool = RenderPool()
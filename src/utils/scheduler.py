@@ -0,0 +1,413 @@
+"""
+UFO posting scheduler for the UFO Sighting Bot.
+One min-heap of (next_fire_time, guild_id) drives posting for every configured guild.
+"""
+import asyncio
+import heapq
+import json
+import os
+import random
+import time
+
+from .config import load_config, get_guild_channel_id
+from .helpers import get_random_interval
+from .log import get_logger
+from .metrics import storage_flush
+from .shards import shard_for_guild
+from .state import get_state_backend, run_state_call
+
+log = get_logger(__name__)
+
+SCHEDULE_FILE = "data/schedule.json"
+
+# Number of workers that post to due guilds concurrently
+POSTING_WORKERS = 4
+
+# Drops that came due while the bot was offline are spread over this window (in seconds)
+CATCH_UP_WINDOW = 30 * 60
+
+# Schedule changes are batched into one save after this delay (in seconds)
+SAVE_DELAY = 5
+
+# Posts are prepared (image picked and rendered) this long before they fire (in seconds)
+PREFETCH_AHEAD = 10 * 60
+
+# Most prepared posts held at once; drops beyond this prepare at fire time
+MAX_PREFETCHED = 32
+
+
+def load_schedule():
+    """Load persisted schedule state from JSON file (or the shared state backend)."""
+    backend = get_state_backend()
+    if backend is not None:
+        return backend.load_hash("schedule")
+    if not os.path.exists(SCHEDULE_FILE):
+        return {}
+    try:
+        with open(SCHEDULE_FILE, "r") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return {}
+
+def save_schedule(schedule_data, removed=()):
+    """Save schedule state to JSON file (or the shared state backend).
+
+    The shared backend only writes these guilds and deletes the removed ones,
+    so processes owning other shards keep their entries.
+    """
+    backend = get_state_backend()
+    if backend is not None:
+        backend.update_hash("schedule", schedule_data, remove=list(removed))
+        return
+    # Ensure data directory exists
+    os.makedirs(os.path.dirname(SCHEDULE_FILE), exist_ok=True)
+    with open(SCHEDULE_FILE, "w") as f:
+        json.dump(schedule_data, f, indent=4)
+
+
+def get_configured_guilds(config):
+    """Get the IDs of guilds that have a UFO image channel configured."""
+    # Top-level keys that are not guild IDs (like global_log_channel_id) are skipped
+    return {
+        guild_id for guild_id, guild_config in config.items()
+        if guild_id.isdigit() and get_guild_channel_id(guild_config)
+    }
+
+
+class PostingScheduler:
+    """Fires UFO posts for configured guilds from a single timer.
+
+    Guilds are kept in a min-heap ordered by their next fire time. The timer
+    task hands due guilds to a bounded pool of workers that run the post
+    callback, then the guild is rescheduled with a fresh random interval.
+    Config changes add and remove guilds; nothing polls for them.
+
+    Next fire times and last-post metadata are persisted, so a restart
+    resumes the planned drops instead of drawing fresh intervals.
+
+    The scheduler is also the guild lifecycle registry: once the bot's guilds
+    are known, only guilds the bot is in are scheduled, and joining or
+    leaving a guild starts or drops its schedule.
+
+    Schedules are partitioned by shard: a scheduler only schedules guilds on
+    the shards it was given, so each shard's guilds have exactly one owner.
+
+    With a prepare callback, each post's payload is prepared PREFETCH_AHEAD
+    before it fires (at most MAX_PREFETCHED at once) and handed to the post
+    callback, so slow downloads and renders don't land at post time.
+    """
+
+    def __init__(self, post_callback, workers=POSTING_WORKERS, prepare_callback=None):
+        self._post = post_callback
+        self._prepare = prepare_callback
+        self._worker_count = workers
+        self._heap = []
+        # guild_id -> fire time; heap items that don't match are stale
+        self._next_fire = {}
+        self._in_flight = set()
+        # guild_id -> {"last_post": time, "last_message_id": id}
+        self._last_posts = {}
+        # Guilds unscheduled since the last save
+        self._removed = set()
+        # Guilds the bot is in (None until the guild list is known)
+        self._member_guilds = None
+        # Shards this scheduler owns (None owns every shard)
+        self._shard_count = None
+        self._shard_ids = None
+        self._restored = False
+        self._save_handle = None
+        self._save_task = None
+        # guild_id -> timer handle that starts preparing its next post
+        self._prefetch_handles = {}
+        # guild_id -> task preparing its next post's payload
+        self._prepared = {}
+        self._queue = None
+        self._wakeup = None
+        self._tasks = []
+
+    def __contains__(self, guild_id):
+        return guild_id in self._next_fire or guild_id in self._in_flight
+
+    @property
+    def due_count(self):
+        """Number of due guilds waiting for a posting worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def active_count(self):
+        """Number of guilds with an active posting schedule."""
+        return len(self._next_fire) + len(self._in_flight)
+
+    def owns(self, guild_id):
+        """Check whether a guild is on one of this scheduler's shards."""
+        if self._shard_ids is None or not self._shard_count:
+            return True
+        return shard_for_guild(guild_id, self._shard_count) in self._shard_ids
+
+    def schedules_by_shard(self):
+        """Count active schedules per shard."""
+        counts = {}
+        shard_count = self._shard_count or 1
+        for guild_id in set(self._next_fire) | self._in_flight:
+            shard_id = shard_for_guild(guild_id, shard_count)
+            counts[shard_id] = counts.get(shard_id, 0) + 1
+        return counts
+
+    def next_fire_time(self, guild_id):
+        """Get the wall-clock time a guild will next post, or None."""
+        return self._next_fire.get(guild_id)
+
+    def schedule(self, guild_id, delay=None, fire_at=None):
+        """Schedule a guild's next post (after a random interval by default).
+
+        A guild only ever has one schedule: scheduling it again replaces the
+        previous fire time.
+        """
+        if fire_at is None:
+            if delay is None:
+                delay = get_random_interval()
+            fire_at = time.time() + delay
+        self._next_fire[guild_id] = fire_at
+        self._removed.discard(guild_id)
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (fire_at, guild_id))
+        if self._wakeup is not None and (earliest is None or fire_at < earliest):
+            self._wakeup.set()
+        self._arm_prefetch(guild_id, fire_at)
+        self._save_soon()
+
+    def unschedule(self, guild_id):
+        """Stop posting to a guild (its heap item is skipped when popped)."""
+        self._next_fire.pop(guild_id, None)
+        self._in_flight.discard(guild_id)
+        self._last_posts.pop(guild_id, None)
+        self._cancel_prefetch(guild_id)
+        self._removed.add(guild_id)
+        self._save_soon()
+
+    def _arm_prefetch(self, guild_id, fire_at):
+        """Start preparing a guild's post PREFETCH_AHEAD before it fires."""
+        self._cancel_prefetch(guild_id)
+        if self._prepare is None or self._wakeup is None:
+            return
+        loop = asyncio.get_running_loop()
+        delay = max(0, fire_at - PREFETCH_AHEAD - time.time())
+        self._prefetch_handles[guild_id] = loop.call_later(delay, self._start_prefetch, guild_id, fire_at)
+
+    def _start_prefetch(self, guild_id, fire_at):
+        self._prefetch_handles.pop(guild_id, None)
+        if self._next_fire.get(guild_id) != fire_at:
+            return
+        if len(self._prepared) >= MAX_PREFETCHED:
+            return  # Over budget: this post is prepared when it fires
+        self._prepared[guild_id] = asyncio.create_task(self._prepare(guild_id))
+
+    def _cancel_prefetch(self, guild_id):
+        handle = self._prefetch_handles.pop(guild_id, None)
+        if handle is not None:
+            handle.cancel()
+        task = self._prepared.pop(guild_id, None)
+        if task is not None:
+            task.cancel()
+
+    async def _take_prepared(self, guild_id):
+        """Get a guild's prepared payload, or None if it wasn't prepared."""
+        task = self._prepared.pop(guild_id, None)
+        if task is None:
+            return None
+        try:
+            return await task
+        except Exception as e:
+            log.warning("⚠️ Failed to prepare UFO post", guild=guild_id, error=e)
+            return None
+
+    def restore(self, config=None):
+        """Resume persisted schedules for configured guilds (only runs once).
+
+        Drops that came due while the bot was offline are spread randomly
+        over the catch-up window instead of all firing at once.
+        """
+        if self._restored:
+            return
+        self._restored = True
+        if config is None:
+            config = load_config()
+        configured = get_configured_guilds(config)
+        now = time.time()
+        for guild_id, state in load_schedule().items():
+            if guild_id not in configured or guild_id in self or not self.owns(guild_id):
+                continue
+            if state.get("last_post"):
+                self._last_posts[guild_id] = {
+                    "last_post": state["last_post"],
+                    "last_message_id": state.get("last_message_id")
+                }
+            fire_at = state.get("next_fire") or now
+            if fire_at <= now:
+                fire_at = now + random.uniform(0, CATCH_UP_WINDOW)
+            self.schedule(guild_id, fire_at=fire_at)
+        log.info("🗓️ Restored UFO posting schedules", schedules=self.active_count)
+
+    def _snapshot(self):
+        """Get every guild's saved state, and the guilds removed since the last save."""
+        schedule_data = {}
+        for guild_id in set(self._next_fire) | self._in_flight:
+            state = dict(self._last_posts.get(guild_id, {}))
+            # In-flight guilds have no fire time yet; they'll be rescheduled on restore
+            state["next_fire"] = self._next_fire.get(guild_id)
+            schedule_data[guild_id] = state
+        removed, self._removed = self._removed, set()
+        return schedule_data, removed
+
+    def save(self):
+        """Write every guild's next fire time and last-post metadata to disk."""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        with storage_flush.time("schedule"):
+            save_schedule(*self._snapshot())
+
+    def _save_soon(self):
+        """Batch schedule changes into a single save."""
+        if self._save_handle is not None or self._wakeup is None:
+            return
+        loop = asyncio.get_running_loop()
+        self._save_handle = loop.call_later(SAVE_DELAY, self._start_save)
+
+    def _start_save(self):
+        self._save_handle = None
+        schedule_data, removed = self._snapshot()
+        self._save_task = asyncio.create_task(self._write(schedule_data, removed, self._save_task))
+
+    async def _write(self, schedule_data, removed, previous):
+        """Write a snapshot (off the event loop with the shared backend)."""
+        # Saves land in order, so an older snapshot never overwrites a newer one
+        if previous is not None and not previous.done():
+            await asyncio.wait([previous])
+        try:
+            with storage_flush.time("schedule"):
+                await run_state_call(save_schedule, schedule_data, removed)
+        except Exception as e:
+            # Removed guilds are deleted with the next save instead
+            self._removed |= removed
+            log.warning("⚠️ Failed to save the posting schedule", error=e)
+
+    def sync_config(self, config=None):
+        """Add newly configured guilds and drop unconfigured ones.
+
+        Guilds that are already scheduled keep their next fire time, so this
+        is safe to call on every config save and every reconnect. Before the
+        persisted schedule is restored it does nothing, so fresh random fire
+        times never replace the saved ones (start() syncs after restoring).
+        """
+        if not self._restored:
+            return
+        if config is None:
+            config = load_config()
+        wanted = {guild_id for guild_id in get_configured_guilds(config) if self.owns(guild_id)}
+        if self._member_guilds is not None:
+            wanted &= self._member_guilds
+        for guild_id in wanted:
+            if guild_id not in self:
+                self.schedule(guild_id)
+        for guild_id in list(self._next_fire) + list(self._in_flight):
+            if guild_id not in wanted:
+                self.unschedule(guild_id)
+
+    def set_shards(self, shard_count, shard_ids=None):
+        """Set the shard layout and drop schedules for guilds on other shards (once restored)."""
+        self._shard_count = shard_count
+        self._shard_ids = set(shard_ids) if shard_ids is not None else None
+        self.sync_config()
+
+    def set_member_guilds(self, guild_ids):
+        """Set the guilds the bot is in and garbage-collect schedules for any others."""
+        self._member_guilds = set(guild_ids)
+        self.sync_config()
+
+    def add_guild(self, guild_id):
+        """Register a guild the bot joined; it is scheduled if it has a channel configured."""
+        if self._member_guilds is not None:
+            self._member_guilds.add(guild_id)
+        if guild_id in self or not self.owns(guild_id):
+            return
+        if guild_id in get_configured_guilds(load_config()):
+            self.schedule(guild_id)
+
+    def remove_guild(self, guild_id):
+        """Forget a guild the bot left and cancel its schedule."""
+        if self._member_guilds is not None:
+            self._member_guilds.discard(guild_id)
+        self.unschedule(guild_id)
+
+    def start(self):
+        """Restore persisted schedules and start the timer and worker tasks.
+
+        Safe to call more than once: running tasks are never duplicated.
+        """
+        if self._tasks and not all(task.done() for task in self._tasks):
+            return
+        self.restore()
+        self.sync_config()
+        self._queue = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+        self._save_soon()
+        for guild_id, fire_at in self._next_fire.items():
+            self._arm_prefetch(guild_id, fire_at)
+        self._tasks = [asyncio.create_task(self._run_timer())]
+        for _ in range(self._worker_count):
+            self._tasks.append(asyncio.create_task(self._run_worker()))
+
+    def stop(self):
+        """Persist the schedule and cancel the timer and worker tasks."""
+        if self._tasks:
+            self.save()
+        for guild_id in list(self._prefetch_handles) + list(self._prepared):
+            self._cancel_prefetch(guild_id)
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def _run_timer(self):
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            fire_at, guild_id = heapq.heappop(self._heap)
+            if self._next_fire.get(guild_id) != fire_at:
+                continue  # Stale item: rescheduled or unscheduled since
+            del self._next_fire[guild_id]
+            self._in_flight.add(guild_id)
+            self._queue.put_nowait(guild_id)
+
+    async def _run_worker(self):
+        while True:
+            guild_id = await self._queue.get()
+            try:
+                if self._prepare is not None:
+                    message_id = await self._post(guild_id, await self._take_prepared(guild_id))
+                else:
+                    message_id = await self._post(guild_id)
+                if message_id is not None:
+                    self._last_posts[guild_id] = {
+                        "last_post": time.time(),
+                        "last_message_id": message_id
+                    }
+            except Exception as e:
+                log.warning("⚠️ Failed to post UFO image", guild=guild_id, error=e)
+            finally:
+                self._queue.task_done()
+            # Only reschedule if the guild wasn't unscheduled while posting
+            if guild_id in self._in_flight:
+                self._in_flight.discard(guild_id)
+                self.schedule(guild_id)
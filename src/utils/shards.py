@@ -0,0 +1,68 @@
+"""
+Sharding utilities for the UFO Sighting Bot.
+Maps guilds to shards and keeps per-shard event rates for /botinfo.
+"""
+import os
+import time
+
+# Length of the event rate window (in seconds)
+EVENT_RATE_WINDOW = 60
+
+
+def get_shard_count():
+    """Get the configured shard count (None lets Discord pick it)."""
+    shard_count = os.getenv('SHARD_COUNT')
+    return int(shard_count) if shard_count else None
+
+def get_shard_ids():
+    """Get the shard IDs this process runs (None runs every shard)."""
+    shard_ids = os.getenv('SHARD_IDS')
+    if not shard_ids:
+        return None
+    return [int(shard_id) for shard_id in shard_ids.split(",")]
+
+def get_cluster_id():
+    """Get this process's cluster ID (0 when not started by the cluster launcher)."""
+    return int(os.getenv('CLUSTER_ID', '0'))
+
+def shard_for_guild(guild_id, shard_count):
+    """Get the shard a guild belongs to (Discord's sharding formula)."""
+    return (int(guild_id) >> 22) % shard_count
+
+
+class ShardStats:
+    """Per-shard event counts over tumbling one-minute windows."""
+
+    def __init__(self):
+        # shard_id -> [window start, events this window, events last window]
+        self._windows = {}
+
+    def record(self, shard_id):
+        """Count one gateway event handled for a shard."""
+        now = time.monotonic()
+        window = self._windows.get(shard_id)
+        if window is None:
+            self._windows[shard_id] = [now, 1, 0]
+            return
+        if now - window[0] >= EVENT_RATE_WINDOW:
+            # Keep the finished window only if it ended just now
+            window[2] = window[1] if now - window[0] < 2 * EVENT_RATE_WINDOW else 0
+            window[0] = now
+            window[1] = 0
+        window[1] += 1
+
+    def events_per_minute(self, shard_id):
+        """Get a shard's event rate from the last complete window."""
+        window = self._windows.get(shard_id)
+        if window is None:
+            return 0
+        elapsed = time.monotonic() - window[0]
+        if elapsed >= 2 * EVENT_RATE_WINDOW:
+            return 0
+        if elapsed >= EVENT_RATE_WINDOW:
+            return window[1]
+        return window[2]
+
+
+# Shared per-shard event counters
+shard_stats = ShardStats()
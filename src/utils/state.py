@@ -0,0 +1,143 @@
+"""
+Shared state backend for the UFO Sighting Bot.
+When STATE_BACKEND_URL is set, counters, bans, tickets and the posting schedule
+live in a Redis-protocol server so several bot processes can share them.
+Without it, the JSON files in data/ are used as before.
+"""
+import asyncio
+import json
+import os
+
+from .log import get_logger
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+log = get_logger(__name__)
+
+_UNSET = object()
+_backend = _UNSET
+
+
+class RedisStateBackend:
+    """State stored in Redis hashes.
+
+    Works with any client that speaks the redis-py API, so a local stand-in
+    (like fakeredis) can replace a real server in tests.
+    """
+
+    def __init__(self, client, prefix="ufo"):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, *parts):
+        return ":".join((self.prefix,) + tuple(str(part) for part in parts))
+
+    # --- JSON document hashes (bans, tickets, schedule) ---
+
+    def load_hash(self, name):
+        """Load every field of a hash as decoded JSON values."""
+        raw = self.client.hgetall(self._key(name))
+        return {_text(field): json.loads(value) for field, value in raw.items()}
+
+    def save_hash(self, name, data):
+        """Replace a whole hash."""
+        key = self._key(name)
+        pipe = self.client.pipeline()
+        pipe.delete(key)
+        if data:
+            pipe.hset(key, mapping={field: json.dumps(value) for field, value in data.items()})
+        pipe.execute()
+
+    def update_hash(self, name, data, remove=()):
+        """Set some fields and remove others without touching the rest of the hash."""
+        key = self._key(name)
+        pipe = self.client.pipeline()
+        if data:
+            pipe.hset(key, mapping={field: json.dumps(value) for field, value in data.items()})
+        if remove:
+            pipe.hdel(key, *remove)
+        pipe.execute()
+
+    def get_field(self, name, field):
+        """Get one decoded field of a hash, or None."""
+        value = self.client.hget(self._key(name), field)
+        return json.loads(value) if value is not None else None
+
+    def set_field(self, name, field, value):
+        """Set one field of a hash."""
+        self.client.hset(self._key(name), field, json.dumps(value))
+
+    def delete_field(self, name, field):
+        """Delete one field of a hash. Returns True if it existed."""
+        return bool(self.client.hdel(self._key(name), field))
+
+    # --- Sighting counters (one hash per guild) ---
+
+    def load_counters(self):
+        """Load every guild's sighting counters merged across all processes."""
+        guild_ids = sorted(_text(guild_id) for guild_id in self.client.smembers(self._key("reaction_guilds")))
+        pipe = self.client.pipeline()
+        for guild_id in guild_ids:
+            pipe.hgetall(self._key("reactions", guild_id))
+        counters = {}
+        for guild_id, raw in zip(guild_ids, pipe.execute()):
+            counters[guild_id] = {_text(user_id): int(count) for user_id, count in raw.items()}
+        return counters
+
+    def save_counters(self, data):
+        """Replace every guild's sighting counters."""
+        pipe = self.client.pipeline()
+        for guild_id in self.client.smembers(self._key("reaction_guilds")):
+            pipe.delete(self._key("reactions", _text(guild_id)))
+        pipe.delete(self._key("reaction_guilds"))
+        for guild_id, guild_data in data.items():
+            pipe.sadd(self._key("reaction_guilds"), guild_id)
+            if guild_data:
+                pipe.hset(self._key("reactions", guild_id), mapping=guild_data)
+        pipe.execute()
+
+    def increment_counter(self, guild_id, user_id, amount=1):
+        """Atomically add to a user's sighting count. Returns the new count."""
+        pipe = self.client.pipeline()
+        pipe.sadd(self._key("reaction_guilds"), guild_id)
+        pipe.hincrby(self._key("reactions", guild_id), user_id, amount)
+        return int(pipe.execute()[1])
+
+
+def _text(value):
+    """Decode a bytes reply (clients without decode_responses return bytes)."""
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def get_state_backend():
+    """Get the shared state backend, or None to use the JSON files."""
+    global _backend
+    if _backend is _UNSET:
+        url = os.getenv('STATE_BACKEND_URL')
+        if not url:
+            _backend = None
+        elif redis is None:
+            raise RuntimeError("STATE_BACKEND_URL is set but the 'redis' package is not installed")
+        else:
+            _backend = RedisStateBackend(redis.Redis.from_url(url, decode_responses=True))
+            log.info("🗄️ Using shared state backend")
+    return _backend
+
+async def run_state_call(func, *args, **kwargs):
+    """Call a state function from async code without blocking the event loop.
+
+    With the shared backend every call is a network round trip, so it runs in
+    a worker thread. The JSON files stay on the event loop so their
+    read-modify-write updates never interleave.
+    """
+    if get_state_backend() is None:
+        return func(*args, **kwargs)
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+def set_state_backend(backend):
+    """Use a specific backend (None for the JSON files), e.g. a local stand-in."""
+    global _backend
+    _backend = backend
@@ -5,12 +5,16 @@ Handles loading, saving, and managing support tickets.
 import json
 import os
 from datetime import datetime
+from .state import get_state_backend
 
 # File path for tickets data
 TICKETS_FILE = "data/tickets.json"
 
 def load_tickets():
-    """Load support tickets from JSON file."""
+    """Load support tickets from JSON file (or the shared state backend)."""
+    backend = get_state_backend()
+    if backend is not None:
+        return backend.load_hash("tickets")
     if not os.path.exists(TICKETS_FILE):
         return {}
     try:
@@ -20,7 +24,11 @@ def load_tickets():
         return {}
 
 def save_tickets(tickets_data):
-    """Save support tickets to JSON file."""
+    """Save support tickets to JSON file (or the shared state backend)."""
+    backend = get_state_backend()
+    if backend is not None:
+        backend.save_hash("tickets", tickets_data)
+        return
     # Ensure data directory exists
     os.makedirs(os.path.dirname(TICKETS_FILE), exist_ok=True)
     with open(TICKETS_FILE, "w") as f:
@@ -33,11 +41,8 @@ def create_ticket(user_id, user_name, guild_id, guild_name, message):
     # Generate unique ticket ID
     ticket_id = str(uuid.uuid4())[:8]
     
-    # Load existing tickets
-    tickets = load_tickets()
-    
     # Create new ticket
-    tickets[ticket_id] = {
+    ticket = {
         "user_id": user_id,
         "user_name": user_name,
         "guild_id": guild_id,
@@ -47,18 +52,37 @@ def create_ticket(user_id, user_name, guild_id, guild_name, message):
         "status": "open"
     }
     
-    # Save tickets
+    # Shared backend stores just this ticket so other processes' tickets are untouched
+    backend = get_state_backend()
+    if backend is not None:
+        backend.set_field("tickets", ticket_id, ticket)
+        return ticket_id
+    
+    # Load existing tickets, add the new one and save
+    tickets = load_tickets()
+    tickets[ticket_id] = ticket
     save_tickets(tickets)
     
     return ticket_id
 
 def get_ticket(ticket_id):
     """Get a specific ticket by ID."""
+    backend = get_state_backend()
+    if backend is not None:
+        return backend.get_field("tickets", ticket_id)
     tickets = load_tickets()
     return tickets.get(ticket_id)
 
 def update_ticket(ticket_id, updates):
     """Update a ticket with new information."""
+    backend = get_state_backend()
+    if backend is not None:
+        ticket = backend.get_field("tickets", ticket_id)
+        if ticket is None:
+            return False
+        ticket.update(updates)
+        backend.set_field("tickets", ticket_id, ticket)
+        return True
     tickets = load_tickets()
     if ticket_id in tickets:
         tickets[ticket_id].update(updates)
@@ -83,6 +107,9 @@ def close_ticket(ticket_id, closed_by="admin", admin_response=None, admin_respon
 
 def delete_ticket(ticket_id):
     """Permanently delete a ticket."""
+    backend = get_state_backend()
+    if backend is not None:
+        return backend.delete_field("tickets", ticket_id)
     tickets = load_tickets()
     if ticket_id in tickets:
         del tickets[ticket_id]
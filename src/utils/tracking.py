@@ -0,0 +1,164 @@
+"""
+UFO message tracking utilities for the UFO Sighting Bot.
+Keeps bot UFO messages in a TTL map with a single background reaper.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+
+from .dispatch import outbound, channel_route, PRIORITY_POST
+from .log import get_logger
+
+log = get_logger(__name__)
+
+# How long a UFO image stays visible before it is deleted (in seconds)
+DELETE_DELAY = 4
+
+# How long a message stays tracked after it was posted (in seconds)
+# Covers the visible time plus 60 seconds to catch late reactions
+TRACKING_TTL = DELETE_DELAY + 60
+
+# Upper bound on tracked messages so memory stays bounded
+MAX_TRACKED_MESSAGES = 10000
+
+# Reaper task kinds
+_EXPIRE = 0
+_DELETE = 1
+
+
+class TrackedMessage:
+    """A tracked UFO message, its expiry time and the users credited for it."""
+    __slots__ = ("guild_id", "expires_at", "spotters")
+
+    def __init__(self, guild_id, expires_at):
+        self.guild_id = guild_id
+        self.expires_at = expires_at
+        # Created on first credit so most messages never allocate a set
+        self.spotters = None
+
+    def credit_spotter(self, user_id):
+        """Credit a user for this message. Returns False if already credited."""
+        if self.spotters is None:
+            self.spotters = set()
+        elif user_id in self.spotters:
+            return False
+        self.spotters.add(user_id)
+        return True
+
+
+class MessageTracker:
+    """TTL map of bot UFO messages (message_id -> guild_id).
+
+    One reaper task pops a heap ordered by due time and handles both the
+    delayed deletes of posted messages and the expiry of tracking entries.
+    """
+
+    def __init__(self, ttl=TRACKING_TTL, max_entries=MAX_TRACKED_MESSAGES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._wakeup = None
+        self._task = None
+        # Running deletes (the event loop only keeps weak references to tasks)
+        self._deletes = set()
+
+    def __contains__(self, message_id):
+        entry = self._entries.get(message_id)
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, message_id):
+        """Get the tracked entry for a message, or None if not tracked."""
+        entry = self._entries.get(message_id)
+        if entry is None or entry.expires_at <= time.monotonic():
+            return None
+        return entry
+
+    def track(self, message_id, guild_id, ttl=None):
+        """Start tracking a message for reactions until its TTL runs out."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        # Re-tracking a message replaces the old entry (its heap item goes stale)
+        self._entries.pop(message_id, None)
+        self._entries[message_id] = TrackedMessage(guild_id, expires_at)
+        self._push(expires_at, _EXPIRE, message_id)
+
+        # Evict the oldest entries if we are over the limit
+        while len(self._entries) > self.max_entries:
+            oldest_id = next(iter(self._entries))
+            self._forget(oldest_id)
+        return self._entries[message_id]
+
+    def untrack(self, message_id):
+        """Stop tracking a message."""
+        self._forget(message_id)
+
+    def schedule_delete(self, message, delay=DELETE_DELAY):
+        """Delete a message after a delay without holding a coroutine open."""
+        self._push(time.monotonic() + delay, _DELETE, message)
+
+    def start(self):
+        """Start the reaper task (safe to call more than once)."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    def stop(self):
+        """Cancel the reaper task."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _forget(self, message_id):
+        self._entries.pop(message_id, None)
+
+    def _push(self, due, kind, payload):
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (due, next(self._counter), kind, payload))
+        # Wake the reaper if this item is now the next one due
+        if self._wakeup is not None and (earliest is None or due < earliest):
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, kind, payload = heapq.heappop(self._heap)
+                if kind == _DELETE:
+                    task = asyncio.create_task(self._delete(payload))
+                    self._deletes.add(task)
+                    task.add_done_callback(self._deletes.discard)
+                else:
+                    self._expire(payload, now)
+
+    def _expire(self, message_id, now):
+        entry = self._entries.get(message_id)
+        # Skip stale heap items for messages that were re-tracked or evicted
+        if entry is not None and entry.expires_at <= now:
+            del self._entries[message_id]
+            log.debug("🧹 Stopped tracking UFO message", message=message_id)
+
+    async def _delete(self, message):
+        try:
+            await outbound.send(PRIORITY_POST, channel_route(message.channel), message.delete)
+            log.debug("🗑️ UFO message deleted", message=message.id)
+        except Exception as e:
+            log.warning("⚠️ Failed to delete UFO message", message=message.id, error=e)
@@ -0,0 +1,148 @@
+"""
+Rendered image variant cache for the UFO Sighting Bot.
+Each (image, effect) pair is rendered once and served from memory afterwards.
+"""
+import asyncio
+import hashlib
+from collections import OrderedDict
+
+from .animation import render_animated_effect, render_file_animated_effect
+from .effects import render_effect, render_file_effect, EFFECT_VERSION
+from .effect_registry import effect_registry
+from .image_cache import image_cache
+from .library import image_library, is_library_source
+from .log import get_logger
+from .metrics import metrics
+from .render_pool import render_pool
+
+log = get_logger(__name__)
+
+# Memory budget for rendered variants (least recently used are dropped first)
+VARIANT_CACHE_BYTES = 128 * 1024 * 1024
+
+render_time = metrics.histogram(
+    "ufo_render_seconds", "Time to render and encode an image variant, waits for a worker included", ("effect",)
+)
+
+
+class RenderedVariant:
+    """Encoded bytes of one rendered (image, effect) pair."""
+    __slots__ = ("data", "content_hash", "filename")
+
+    def __init__(self, data, effect, extension="png"):
+        self.data = data
+        self.content_hash = hashlib.sha256(data).hexdigest()
+        self.filename = f"ufo_{effect}.{extension}"
+
+
+class VariantCache:
+    """In-memory LRU of rendered (image source, effect) pairs.
+
+    configure() is given the current image sources; when they, a library
+    image's content hash, the effect registry's stages or EFFECT_VERSION
+    change, every cached render is dropped and pairs are re-rendered in the
+    background until the memory budget is full.
+
+    Sources are URLs or local library images. URL images posted with an
+    effect that leaves them unchanged are linked directly, so only library
+    images cache those. Animated effects are cached like any other.
+    """
+
+    def __init__(self, memory_budget=VARIANT_CACHE_BYTES):
+        self.memory_budget = memory_budget
+        self._variants = OrderedDict()  # (source, effect) -> RenderedVariant
+        self._bytes = 0
+        self._pending = {}   # (source, effect) -> task rendering it
+        self._definition = None
+        self._warm_task = None
+
+    def __len__(self):
+        return len(self._variants)
+
+    def configure(self, image_urls):
+        """Set the images to cache, invalidating on any image or effect change."""
+        effect_registry.reload_if_changed()
+        # Effects that are off by default render on demand for servers that turn them on
+        effects = [name for name, weight in effect_registry.weights().items() if weight > 0]
+        # Library images replaced in place keep their source name but not their hash
+        images = tuple((url, image_library.content_hash(url)) for url in image_urls)
+        definition = (images, effect_registry.signature(), EFFECT_VERSION)
+        if definition == self._definition:
+            return
+        if self._definition is not None:
+            log.info("🔁 Image list or effects changed - dropping cached renders")
+        self._definition = definition
+        self._variants.clear()
+        self._bytes = 0
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+        self._warm_task = asyncio.create_task(self._warm(image_urls, effects))
+
+    async def get(self, url, effect):
+        """Get a rendered variant, rendering it now if it isn't cached yet."""
+        key = (url, effect)
+        variant = self._variants.get(key)
+        if variant is not None:
+            self._variants.move_to_end(key)
+            return variant
+        # Share one render between concurrent requests for the same variant
+        task = self._pending.get(key)
+        if task is None:
+            task = self._pending[key] = asyncio.create_task(self._render(url, effect))
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _render(self, url, effect):
+        definition = self._definition
+        stages = effect_registry.stages(effect)
+        animation = effect_registry.animation(effect)
+        if is_library_source(url):
+            # Workers memory-map library files themselves
+            source = image_library.path(url)
+            render = render_file_effect if animation is None else render_file_animated_effect
+        else:
+            source = await image_cache.get(url)
+            if source is None:
+                return None
+            render = render_effect if animation is None else render_animated_effect
+        with render_time.time(effect):
+            if animation is None:
+                encoded = await render_pool.run(render, source, stages)
+            else:
+                encoded = await render_pool.run(render, source, stages, animation)
+        log.debug("🖼️ Rendered UFO variant", effect=effect, format=encoded.format, kb=len(encoded.data) // 1024,
+                  quality=encoded.quality, encode_ms=round(encoded.encode_time * 1000))
+        variant = RenderedVariant(encoded.data, effect, encoded.extension)
+        # Don't store renders made for a definition that has since changed
+        if definition == self._definition:
+            self._remember((url, effect), variant)
+        return variant
+
+    def _remember(self, key, variant):
+        """Add a variant, evicting the least recently used over the budget."""
+        self._variants[key] = variant
+        self._bytes += len(variant.data)
+        while self._bytes > self.memory_budget and len(self._variants) > 1:
+            _, evicted = self._variants.popitem(last=False)
+            self._bytes -= len(evicted.data)
+
+    async def _warm(self, image_urls, effects):
+        """Render (image, effect) pairs one at a time until the budget is full."""
+        rendered = 0
+        for url in image_urls:
+            for effect in effects:
+                if effect_registry.is_passthrough(effect) and not is_library_source(url):
+                    continue
+                if self._bytes >= self.memory_budget:
+                    log.info("🎨 Pre-rendered UFO image variants (memory budget full)", variants=rendered)
+                    return
+                try:
+                    if await self.get(url, effect) is not None:
+                        rendered += 1
+                except Exception as e:
+                    log.warning("⚠️ Failed to pre-render UFO variant", effect=effect, image=url, error=e)
+        log.info("🎨 Pre-rendered UFO image variants", variants=rendered)
+
+
+# Shared variant cache
+variant_cache = VariantCache()
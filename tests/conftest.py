@@ -0,0 +1,20 @@
+"""
+Shared test setup for the UFO Sighting Bot.
+"""
+import os
+import sys
+
+import pytest
+
+# The bot imports its modules from src/ (like run_bot.py does)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils import config
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Run every test in an empty directory so data/ files never leak between tests."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "_cached_config", None)
+    return tmp_path / "data"
@@ -0,0 +1,157 @@
+"""
+Tests for the outbound send dispatcher: priorities and per-route parking.
+"""
+import asyncio
+
+import pytest
+
+from utils import dispatch
+from utils.dispatch import (
+    OutboundDispatcher, PRIORITY_INTERACTION, PRIORITY_POST, PRIORITY_BACKGROUND
+)
+
+
+@pytest.fixture(autouse=True)
+def no_pacing(monkeypatch):
+    monkeypatch.setattr(dispatch, "BACKGROUND_PACING", (0, 0))
+
+
+def recorder(log, name, delay=0):
+    async def request():
+        log.append(f"{name} start")
+        await asyncio.sleep(delay)
+        log.append(f"{name} end")
+        return name
+    return request
+
+
+def test_interactions_run_before_queued_posts():
+    async def scenario():
+        outbound = OutboundDispatcher(foreground_workers=1)
+        outbound.start()
+        log = []
+        gate = asyncio.Event()
+
+        async def blocker():
+            await gate.wait()
+
+        try:
+            busy = outbound.submit(PRIORITY_POST, "channel:0", blocker)
+            await asyncio.sleep(0)
+            sends = [outbound.submit(PRIORITY_POST, f"channel:{i}", recorder(log, f"post{i}")) for i in (1, 2)]
+            sends.append(outbound.submit(PRIORITY_INTERACTION, "channel:3", recorder(log, "interaction")))
+            gate.set()
+            results = await asyncio.gather(busy, *sends)
+            return log, results, outbound.queued
+        finally:
+            outbound.stop()
+
+    log, results, queued = asyncio.run(scenario())
+    assert [entry for entry in log if entry.endswith("start")] == ["interaction start", "post1 start", "post2 start"]
+    assert results[1:] == ["post1", "post2", "interaction"]
+    assert queued == {"interaction": 0, "post": 0, "background": 0}
+
+
+def test_busy_route_parks_without_blocking_other_routes():
+    async def scenario():
+        outbound = OutboundDispatcher(foreground_workers=2)
+        outbound.start()
+        log = []
+        try:
+            first = outbound.submit(PRIORITY_POST, "channel:1", recorder(log, "first", 0.1))
+            second = outbound.submit(PRIORITY_POST, "channel:1", recorder(log, "second"))
+            other = outbound.submit(PRIORITY_POST, "channel:2", recorder(log, "other"))
+            await asyncio.gather(first, second, other)
+            return log, outbound._routes
+        finally:
+            outbound.stop()
+
+    log, routes = asyncio.run(scenario())
+    # The other route ran while channel:1 was busy, and channel:1 kept its order
+    assert log.index("other end") < log.index("first end")
+    assert log.index("first end") < log.index("second start")
+    # Idle routes are forgotten
+    assert routes == {}
+
+
+def test_parked_sends_keep_priority_order():
+    async def scenario():
+        outbound = OutboundDispatcher(foreground_workers=2)
+        outbound.start()
+        log = []
+        try:
+            sends = [outbound.submit(PRIORITY_POST, "dm:1", recorder(log, "busy", 0.05))]
+            await asyncio.sleep(0.01)
+            sends.append(outbound.submit(PRIORITY_POST, "dm:1", recorder(log, "post")))
+            sends.append(outbound.submit(PRIORITY_INTERACTION, "dm:1", recorder(log, "interaction")))
+            await asyncio.gather(*sends)
+            return [entry for entry in log if entry.endswith("start")]
+        finally:
+            outbound.stop()
+
+    assert asyncio.run(scenario()) == ["busy start", "interaction start", "post start"]
+
+
+def test_background_sends_have_their_own_worker():
+    async def scenario():
+        outbound = OutboundDispatcher(foreground_workers=1)
+        outbound.start()
+        gate = asyncio.Event()
+
+        async def blocker():
+            await gate.wait()
+
+        try:
+            busy = outbound.submit(PRIORITY_INTERACTION, "channel:1", blocker)
+            log = await asyncio.wait_for(
+                outbound.submit(PRIORITY_BACKGROUND, "channel:2", recorder([], "log")), timeout=1
+            )
+            gate.set()
+            await busy
+            return log
+        finally:
+            outbound.stop()
+
+    assert asyncio.run(scenario()) == "log"
+
+
+def test_failures_reach_the_caller():
+    async def failing():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        outbound = OutboundDispatcher()
+        outbound.start()
+        try:
+            with pytest.raises(RuntimeError):
+                await outbound.send(PRIORITY_POST, "channel:1", failing)
+            # The route is free again after a failure
+            return await outbound.send(PRIORITY_POST, "channel:1", recorder([], "after"))
+        finally:
+            outbound.stop()
+
+    assert asyncio.run(scenario()) == "after"
+
+
+def test_cancelled_sends_are_skipped():
+    async def scenario():
+        outbound = OutboundDispatcher(foreground_workers=1)
+        outbound.start()
+        log = []
+        gate = asyncio.Event()
+
+        async def blocker():
+            await gate.wait()
+
+        try:
+            busy = outbound.submit(PRIORITY_POST, "channel:1", blocker)
+            await asyncio.sleep(0)
+            outbound.submit(PRIORITY_POST, "channel:2", recorder(log, "cancelled")).cancel()
+            gate.set()
+            await busy
+            await outbound.send(PRIORITY_POST, "channel:2", recorder(log, "after"))
+            return log
+        finally:
+            outbound.stop()
+
+    assert asyncio.run(scenario()) == ["after start", "after end"]
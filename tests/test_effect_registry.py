@@ -0,0 +1,81 @@
+"""
+Tests for the effect registry, its alias tables and per-server odds.
+"""
+import json
+import random
+from collections import Counter
+
+import pytest
+
+from utils import config
+from utils.config import save_config, set_guild_setting
+from utils.effect_registry import AliasTable, EffectRegistry, DEFAULT_EFFECTS
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = EffectRegistry()
+    # Like the shared registry, forget per-server tables whenever the config is saved
+    monkeypatch.setattr(config, "config_listeners", config.config_listeners + [registry.forget_guild_odds])
+    return registry
+
+
+def only(name):
+    """Server odds that turn on a single effect."""
+    return {effect: 0 for effect in DEFAULT_EFFECTS} | {name: 1}
+
+
+def test_alias_table_follows_the_weights():
+    random.seed(0)
+    table = AliasTable({"a": 6, "b": 3, "c": 1, "off": 0})
+    counts = Counter(table.sample() for _ in range(20000))
+    assert "off" not in counts
+    assert counts["a"] / 20000 == pytest.approx(0.6, abs=0.02)
+    assert counts["b"] / 20000 == pytest.approx(0.3, abs=0.02)
+    assert counts["c"] / 20000 == pytest.approx(0.1, abs=0.02)
+
+
+def test_alias_table_needs_a_positive_weight():
+    with pytest.raises(ValueError):
+        AliasTable({"a": 0})
+
+
+def test_animated_effects_are_off_by_default(registry):
+    registry.reload_if_changed()
+    assert {name for name, weight in registry.weights().items() if weight == 0} == {"glitch", "alienglitch"}
+    assert registry.animation("glitch") is not None
+    random.seed(0)
+    assert not {registry.pick() for _ in range(2000)} & {"glitch", "alienglitch"}
+
+
+def test_effects_file_adds_and_overrides_effects(registry, data_dir):
+    data_dir.mkdir()
+    (data_dir / "effects.json").write_text(json.dumps({
+        "redshift": {"stages": [["tint", [255, 0, 0], 0.4]], "weight": 10},
+        "invert": {"weight": 0},
+        "broken": {"stages": [["sparkle"]]},
+    }))
+    registry.reload_if_changed()
+    assert registry.stages("redshift") == [["tint", [255, 0, 0], 0.4]]
+    assert registry.weights()["invert"] == 0
+    assert registry.stages("invert") == DEFAULT_EFFECTS["invert"]["stages"]
+    assert "broken" not in registry.names
+
+
+def test_server_odds_apply_and_refresh_on_save(registry):
+    save_config({"1": {"channel_id": 5}})
+
+    set_guild_setting(1, "effect_weights", only("invert"))
+    assert {registry.pick("1") for _ in range(50)} == {"invert"}
+    # Guild IDs may be ints or strings
+    assert registry.pick(1) == "invert"
+
+    set_guild_setting(1, "effect_weights", only("vintage"))
+    assert {registry.pick("1") for _ in range(50)} == {"vintage"}
+    # Other servers keep the default odds
+    assert len({registry.pick("2") for _ in range(500)}) > 1
+
+
+def test_no_odds_falls_back_to_normal(registry):
+    save_config({"1": {"channel_id": 5, "effect_weights": {effect: 0 for effect in DEFAULT_EFFECTS}}})
+    assert registry.pick("1") == "normal"
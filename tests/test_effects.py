@@ -0,0 +1,80 @@
+"""
+Tests that the fused single-pass effects match the old multi-pass PIL chains.
+"""
+import random
+
+import pytest
+from PIL import Image, ImageChops, ImageEnhance, ImageOps
+
+from utils.effect_registry import DEFAULT_EFFECTS
+from utils.effects import apply_effect, channel_means
+
+# Fused effects round once instead of after every pass
+MAX_DIFFERENCE = 1
+
+
+def legacy_effect(img, effect):
+    """The multi-pass PIL chains the bot used before the fused kernels."""
+    if effect == "invert":
+        return ImageOps.invert(img)
+    if effect == "greenscale":
+        img = ImageOps.grayscale(img).convert('RGB')
+        img = ImageEnhance.Color(img).enhance(0.3)
+        return Image.blend(img, Image.new('RGB', img.size, (0, 255, 0)), 0.2)
+    if effect == "vintage":
+        img = ImageOps.grayscale(img).convert('RGB')
+        return Image.blend(img, Image.new('RGB', img.size, (255, 218, 185)), 0.3)
+    if effect == "enhanced":
+        img = ImageEnhance.Contrast(img).enhance(1.5)
+        return ImageEnhance.Brightness(img).enhance(1.2)
+    return img
+
+
+def noise_image():
+    rng = random.Random(0)
+    return Image.frombytes('RGB', (64, 48), bytes(rng.getrandbits(8) for _ in range(64 * 48 * 3)))
+
+
+def photo_image():
+    img = Image.linear_gradient('L').resize((96, 64)).convert('RGB')
+    return Image.blend(Image.blend(img, Image.effect_noise((96, 64), 48).convert('RGB'), 0.4),
+                       Image.new('RGB', (96, 64), (200, 40, 90)), 0.3)
+
+
+def split_image():
+    # Mostly dark with a bright half, so contrast pushes values past both ends
+    img = Image.new('RGB', (20, 10), (5, 5, 5))
+    img.paste((250, 240, 230), (10, 0, 20, 10))
+    return img
+
+
+IMAGES = {
+    "noise": noise_image,
+    "photo": photo_image,
+    "split": split_image,
+    "black": lambda: Image.new('RGB', (8, 8), (0, 0, 0)),
+    "white": lambda: Image.new('RGB', (8, 8), (255, 255, 255)),
+    "red": lambda: Image.new('RGB', (8, 8), (255, 0, 0)),
+}
+
+
+@pytest.mark.parametrize("image", IMAGES)
+@pytest.mark.parametrize("effect", ["invert", "greenscale", "vintage", "enhanced"])
+def test_fused_effect_matches_legacy(effect, image):
+    img = IMAGES[image]()
+    fused = apply_effect(img, DEFAULT_EFFECTS[effect]["stages"])
+    difference = ImageChops.difference(legacy_effect(img, effect), fused)
+    assert fused.mode == "RGB" and fused.size == img.size
+    assert max(high for _, high in difference.getextrema()) <= MAX_DIFFERENCE
+
+
+def test_no_stages_returns_the_image():
+    img = photo_image()
+    assert apply_effect(img, []) is img
+
+
+def test_channel_means_match_the_pixels():
+    img = noise_image()
+    pixels = list(img.getdata())
+    expected = [sum(pixel[band] for pixel in pixels) / len(pixels) for band in range(3)]
+    assert channel_means(img) == pytest.approx(expected)
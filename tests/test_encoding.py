@@ -0,0 +1,68 @@
+"""
+Tests for encoding renders to the output byte budget.
+"""
+import io
+import random
+
+from PIL import Image
+
+from utils import effects
+from utils.effects import encode_image, is_photographic, MAX_QUALITY, MIN_QUALITY, PHOTO_FORMAT
+
+
+def noise_image(size=(256, 256), colours=None, seed=0):
+    """Random pixels: from a small palette (flat artwork) or any colour (a photo)."""
+    rng = random.Random(seed)
+    if colours is None:
+        data = bytes(rng.getrandbits(8) for _ in range(size[0] * size[1] * 3))
+    else:
+        palette = [bytes(rng.getrandbits(8) for _ in range(3)) for _ in range(colours)]
+        data = b"".join(rng.choice(palette) for _ in range(size[0] * size[1]))
+    return Image.frombytes('RGB', size, data)
+
+
+def decoded(encoded):
+    with Image.open(io.BytesIO(encoded.data)) as img:
+        img.load()
+        return img.format, img.size
+
+
+def test_flat_images_are_png():
+    img = noise_image(colours=4)
+    assert not is_photographic(img)
+    encoded = encode_image(img)
+    assert encoded.format == "PNG" and encoded.quality is None
+    assert encoded.extension == "png"
+    assert decoded(encoded) == ("PNG", img.size)
+
+
+def test_photos_fit_at_full_quality_when_they_can():
+    img = noise_image()
+    assert is_photographic(img)
+    encoded = encode_image(img)
+    assert encoded.format == PHOTO_FORMAT and encoded.quality == MAX_QUALITY
+    assert decoded(encoded) == ("JPEG", img.size)
+
+
+def test_highest_quality_that_fits_is_chosen():
+    img = noise_image()
+    budget = len(effects._encode(img, PHOTO_FORMAT, 70)) + 1
+    encoded = encode_image(img, budget)
+    assert len(encoded.data) <= budget
+    assert MIN_QUALITY <= encoded.quality < MAX_QUALITY
+    # One step up would not have fit
+    assert len(effects._encode(img, PHOTO_FORMAT, encoded.quality + 1)) > budget
+
+
+def test_lowest_quality_when_nothing_fits():
+    img = noise_image()
+    encoded = encode_image(img, budget=100)
+    assert encoded.quality == MIN_QUALITY
+    assert encoded.data == effects._encode(img, PHOTO_FORMAT, MIN_QUALITY)
+
+
+def test_flat_images_over_budget_fall_back_to_photo_format():
+    img = noise_image(size=(128, 128), colours=2)
+    png_size = len(effects._encode(img, "PNG"))
+    encoded = encode_image(img, budget=png_size - 1)
+    assert encoded.format == PHOTO_FORMAT
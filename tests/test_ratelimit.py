@@ -0,0 +1,71 @@
+"""
+Tests for the token bucket rate limiter.
+"""
+import pytest
+
+from utils import ratelimit
+from utils.ratelimit import RateLimiter
+
+LIMITS = {
+    "default": {"user": [60, 2], "guild": [60, 3]},
+    "reaction": {"user": [60, 1]},
+}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_burst_then_refill(clock):
+    limiter = RateLimiter(LIMITS)
+    assert limiter.retry_after("ping", 1) == 0
+    assert limiter.retry_after("ping", 1) == 0
+    # 60 per minute: the next token is a second away
+    assert limiter.retry_after("ping", 1) == pytest.approx(1.0)
+    assert limiter.rejected == 1
+    clock[0] += 1
+    assert limiter.retry_after("ping", 1) == 0
+
+
+def test_users_have_separate_buckets(clock):
+    limiter = RateLimiter(LIMITS)
+    assert limiter.retry_after("reaction", 1) == 0
+    assert limiter.retry_after("reaction", 1) > 0
+    assert limiter.retry_after("reaction", 2) == 0
+
+
+def test_guild_limit_spans_users(clock):
+    limiter = RateLimiter(LIMITS)
+    for user_id in (1, 2, 3):
+        assert limiter.retry_after("ping", user_id, guild_id=9) == 0
+    assert limiter.retry_after("ping", 4, guild_id=9) > 0
+
+
+def test_rejection_takes_no_tokens(clock):
+    limiter = RateLimiter(LIMITS)
+    for user_id in (1, 2, 3):
+        limiter.retry_after("ping", user_id, guild_id=9)
+    # User 1 still has a token, but the guild is out: neither bucket is charged
+    assert limiter.retry_after("ping", 1, guild_id=9) > 0
+    clock[0] += 1
+    assert limiter.retry_after("ping", 1, guild_id=9) == 0
+
+
+def test_idle_buckets_are_swept(clock):
+    limiter = RateLimiter(LIMITS)
+    limiter.retry_after("ping", 1)
+    assert len(limiter) == 1
+    clock[0] += ratelimit.SWEEP_INTERVAL
+    limiter.retry_after("ping", 2)
+    assert len(limiter) == 1
+
+
+def test_bucket_cap(clock):
+    limiter = RateLimiter(LIMITS, max_buckets=10)
+    for user_id in range(20):
+        clock[0] += 0.001
+        limiter.retry_after("ping", user_id)
+    assert len(limiter) <= 10
@@ -0,0 +1,160 @@
+"""
+Tests for the posting scheduler: restore, config sync, shards and firing.
+"""
+import asyncio
+import time
+
+import pytest
+
+from utils import scheduler
+from utils.config import save_config
+from utils.scheduler import PostingScheduler, load_schedule, save_schedule
+from utils.shards import shard_for_guild
+
+
+@pytest.fixture(autouse=True)
+def fixed_interval(monkeypatch):
+    # Fresh schedules fire in an hour unless a test says otherwise
+    monkeypatch.setattr(scheduler, "get_random_interval", lambda: 3600)
+
+
+def configure(*guild_ids):
+    save_config({guild_id: {"channel_id": 1} for guild_id in guild_ids})
+
+
+async def no_post(guild_id):
+    return None
+
+
+def test_restore_resumes_saved_fire_times():
+    configure("1", "2")
+    now = time.time()
+    save_schedule({
+        "1": {"next_fire": now + 500, "last_post": now - 100, "last_message_id": 7},
+        # No longer configured, so not restored
+        "3": {"next_fire": now + 500},
+    })
+    posting = PostingScheduler(no_post)
+    posting.restore()
+    assert posting.next_fire_time("1") == now + 500
+    assert posting.next_fire_time("3") is None
+    # Not in the saved schedule; sync_config gives it a fresh interval
+    assert "2" not in posting
+    posting.sync_config()
+    assert posting.next_fire_time("2") == pytest.approx(now + 3600, abs=5)
+
+
+def test_overdue_drops_are_spread_over_the_catch_up_window():
+    guild_ids = [str(guild_id) for guild_id in range(1, 21)]
+    configure(*guild_ids)
+    now = time.time()
+    save_schedule({guild_id: {"next_fire": now - 1000} for guild_id in guild_ids})
+    posting = PostingScheduler(no_post)
+    posting.restore()
+    fire_times = [posting.next_fire_time(guild_id) for guild_id in guild_ids]
+    assert all(now <= fire_at <= now + scheduler.CATCH_UP_WINDOW + 5 for fire_at in fire_times)
+    assert len(set(fire_times)) > 1
+
+
+def test_sync_before_restore_keeps_saved_schedule():
+    configure("1")
+    now = time.time()
+    save_schedule({"1": {"next_fire": now + 99999}})
+    posting = PostingScheduler(no_post)
+    # on_ready / setup_hook can set shards before start() restores
+    posting.set_shards(1, [0])
+    posting.set_member_guilds(["1"])
+    assert "1" not in posting
+    posting.restore()
+    posting.sync_config()
+    assert posting.next_fire_time("1") == now + 99999
+
+
+def test_sync_config_adds_and_drops_guilds():
+    configure("1", "2")
+    posting = PostingScheduler(no_post)
+    posting.restore()
+    posting.sync_config()
+    first_fire = posting.next_fire_time("1")
+
+    configure("1", "3")
+    posting.sync_config()
+    assert posting.next_fire_time("1") == first_fire
+    assert "2" not in posting
+    assert "3" in posting
+
+
+def test_member_guilds_and_shards_limit_schedules():
+    guild_ids = [str(guild_id << 22) for guild_id in range(1, 9)]
+    configure(*guild_ids)
+    posting = PostingScheduler(no_post)
+    posting.restore()
+    posting.set_member_guilds(guild_ids[:6])
+    assert posting.active_count == 6
+
+    posting.set_shards(2, [0])
+    expected = {guild_id for guild_id in guild_ids[:6] if shard_for_guild(guild_id, 2) == 0}
+    assert {guild_id for guild_id in guild_ids if guild_id in posting} == expected
+
+
+def test_stop_saves_and_unscheduled_guilds_are_removed():
+    configure("1", "2")
+
+    async def scenario():
+        posting = PostingScheduler(no_post)
+        posting.start()
+        posting.remove_guild("2")
+        posting.stop()
+        return posting.next_fire_time("1")
+
+    next_fire = asyncio.run(scenario())
+    assert load_schedule() == {"1": {"next_fire": next_fire}}
+
+
+def test_due_guild_is_posted_and_rescheduled():
+    configure("1")
+    posted = []
+
+    async def post(guild_id, payload):
+        posted.append((guild_id, payload))
+        return 42
+
+    async def prepare(guild_id):
+        return f"image for {guild_id}"
+
+    async def scenario():
+        posting = PostingScheduler(post, prepare_callback=prepare)
+        posting.start()
+        try:
+            posting.schedule("1", delay=0.05)
+            deadline = time.monotonic() + 2
+            while not posted and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.01)
+            return posting.next_fire_time("1"), posting._last_posts.get("1")
+        finally:
+            posting.stop()
+
+    next_fire, last_post = asyncio.run(scenario())
+    # Prepared ahead of time (the drop is well inside PREFETCH_AHEAD)
+    assert posted == [("1", "image for 1")]
+    assert next_fire == pytest.approx(time.time() + 3600, abs=5)
+    assert last_post["last_message_id"] == 42
+
+
+def test_changes_are_saved_in_the_background(monkeypatch):
+    monkeypatch.setattr(scheduler, "SAVE_DELAY", 0.01)
+    configure("1")
+
+    async def scenario():
+        posting = PostingScheduler(no_post)
+        posting.start()
+        try:
+            posting.schedule("1", delay=500)
+            await asyncio.sleep(0.1)
+            return posting.next_fire_time("1"), load_schedule()
+        finally:
+            posting.stop()
+
+    next_fire, saved = asyncio.run(scenario())
+    assert saved == {"1": {"next_fire": next_fire}}
@@ -0,0 +1,86 @@
+"""
+Tests for the shared state backend, run against fakeredis.
+"""
+import asyncio
+import threading
+
+import fakeredis
+import pytest
+
+from utils import config, helpers, tickets
+from utils import scheduler
+from utils.state import RedisStateBackend, run_state_call, set_state_backend
+
+
+@pytest.fixture
+def backend():
+    backend = RedisStateBackend(fakeredis.FakeRedis(decode_responses=True))
+    set_state_backend(backend)
+    yield backend
+    set_state_backend(None)
+
+
+def test_hash_round_trip(backend):
+    backend.save_hash("tickets", {"a": {"status": "open"}, "b": {"status": "closed"}})
+    backend.update_hash("tickets", {"c": {"status": "open"}}, remove=["b"])
+    assert backend.load_hash("tickets") == {"a": {"status": "open"}, "c": {"status": "open"}}
+    assert backend.get_field("tickets", "a") == {"status": "open"}
+    assert backend.get_field("tickets", "missing") is None
+    assert backend.delete_field("tickets", "a")
+    assert not backend.delete_field("tickets", "a")
+
+
+def test_counters(backend):
+    assert backend.increment_counter("1", "10") == 1
+    assert backend.increment_counter("1", "10") == 2
+    assert backend.increment_counter("2", "20", amount=5) == 5
+    assert backend.load_counters() == {"1": {"10": 2}, "2": {"20": 5}}
+
+    backend.save_counters({"3": {"30": 7}})
+    assert backend.load_counters() == {"3": {"30": 7}}
+
+
+def test_bytes_replies():
+    # Clients without decode_responses return bytes
+    backend = RedisStateBackend(fakeredis.FakeRedis())
+    backend.set_field("banned", "1", {"reason": "spam"})
+    backend.increment_counter("1", "10")
+    assert backend.load_hash("banned") == {"1": {"reason": "spam"}}
+    assert backend.load_counters() == {"1": {"10": 1}}
+
+
+def test_state_functions_use_backend(backend, data_dir):
+    assert config.increment_reaction("1", "10") == 1
+    assert config.increment_reaction("1", "10") == 2
+    assert config.load_reactions() == {"1": {"10": 2}}
+
+    helpers.ban_user(42, "spam", banned_by=1)
+    assert helpers.is_user_banned(42)
+    assert helpers.unban_user(42)
+    assert not helpers.is_user_banned(42)
+
+    ticket_id = tickets.create_ticket(1, "user", 2, "guild", "help")
+    assert tickets.get_ticket(ticket_id)["message"] == "help"
+
+    scheduler.save_schedule({"1": {"next_fire": 100.0}, "2": {"next_fire": 200.0}})
+    scheduler.save_schedule({"3": {"next_fire": 300.0}}, removed=["1"])
+    assert scheduler.load_schedule() == {"2": {"next_fire": 200.0}, "3": {"next_fire": 300.0}}
+
+    # Nothing was written to the JSON files
+    assert not data_dir.exists()
+
+
+def test_run_state_call_leaves_the_event_loop(backend):
+    async def caller_thread():
+        return await run_state_call(threading.get_ident)
+
+    assert asyncio.run(caller_thread()) != threading.get_ident()
+
+
+def test_run_state_call_keeps_json_files_on_the_event_loop():
+    set_state_backend(None)
+
+    async def caller_thread():
+        return await run_state_call(threading.get_ident)
+
+    assert asyncio.run(caller_thread()) == threading.get_ident()
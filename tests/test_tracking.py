@@ -0,0 +1,70 @@
+"""
+Tests for the UFO message tracker and its reaper.
+"""
+import asyncio
+import time
+
+from utils.dispatch import outbound
+from utils.tracking import MessageTracker
+
+
+class FakeChannel:
+    id = 1
+
+
+class FakeMessage:
+    channel = FakeChannel()
+
+    def __init__(self, message_id):
+        self.id = message_id
+        self.deleted = False
+
+    async def delete(self):
+        self.deleted = True
+
+
+def test_entries_expire():
+    tracker = MessageTracker(ttl=60)
+    tracker.track(1, "guild")
+    tracker.track(2, "guild", ttl=0)
+    assert 1 in tracker and tracker.get(1).guild_id == "guild"
+    assert 2 not in tracker and tracker.get(2) is None
+
+
+def test_oldest_entries_are_evicted():
+    tracker = MessageTracker(max_entries=2)
+    for message_id in (1, 2, 3):
+        tracker.track(message_id, "guild")
+    assert len(tracker) == 2
+    assert 1 not in tracker and 3 in tracker
+
+
+def test_spotters_are_credited_once():
+    entry = MessageTracker().track(1, "guild")
+    assert entry.credit_spotter(10)
+    assert not entry.credit_spotter(10)
+    assert entry.credit_spotter(11)
+
+
+def test_reaper_deletes_and_expires():
+    async def scenario():
+        outbound.start()
+        tracker = MessageTracker(ttl=0.05)
+        tracker.start()
+        try:
+            # The reaper is asleep until a later delete and must wake for this one
+            tracker.schedule_delete(FakeMessage(2), delay=60)
+            await asyncio.sleep(0.01)
+            message = FakeMessage(1)
+            tracker.track(message.id, "guild")
+            tracker.schedule_delete(message, delay=0.05)
+            assert not message.deleted
+            deadline = time.monotonic() + 2
+            while (not message.deleted or len(tracker)) and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            return message.deleted, len(tracker)
+        finally:
+            tracker.stop()
+            outbound.stop()
+
+    assert asyncio.run(scenario()) == (True, 0)